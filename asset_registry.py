@@ -0,0 +1,71 @@
+"""
+File: asset_registry.py
+Function: Static files under assets/ (logo, help text, bulletins) loaded -- and images pre-resized -- once per process
+"""
+
+import streamlit as st
+import base64
+import io
+from pathlib import Path
+from PIL import Image
+
+
+# --- Asset registry ---
+# st.image() / st.logo() given a Path re-read, re-decode and re-resize the file on every call. Registry images
+# are bytes prepared once per process at their display size; identical bytes map to the same Streamlit media
+# file (same URL), so the browser downloads each one once, however many cards show it.
+
+ASSET_DIR = Path("assets")
+
+JCPAO_LOGO = "logo/jcpao_logo_500x500.png"
+JCPAO_LOGO_SMALL = "logo/jcpao_logo_200x200.png"
+
+# Logo stand-in widths (px) -- the st.image() widths of the cards that fall back to the logo
+LOGO_SIZES = {
+    "card": 400, # staff / court cards
+    "birthday": 250, # birthday cards
+}
+
+# Define asset_path()
+def asset_path(name: str) -> Path:
+    """Path of a file under assets/ ("logo/jcpao_logo_500x500.png")"""
+    return ASSET_DIR / name
+
+# Define asset_text()
+@st.cache_resource(show_spinner=False)
+def asset_text(name: str) -> str:
+    """Text file under assets/ (help pages, bulletins)"""
+    return asset_path(name).read_text(encoding="utf-8")
+
+# Define asset_files()
+@st.cache_resource(show_spinner=False)
+def asset_files(folder: str, suffix: str = ".txt") -> list:
+    """Names (relative to assets/) of the files with suffix in a folder under assets/, sorted"""
+    return sorted(p.relative_to(ASSET_DIR).as_posix() for p in asset_path(folder).iterdir() if p.is_file() and p.suffix == suffix)
+
+# Define asset_image()
+@st.cache_resource(show_spinner=False)
+def asset_image(name: str, width: int | None = None, image_format: str = "PNG") -> bytes:
+    """Image under assets/ as bytes, scaled down to width px (aspect kept, never upscaled)"""
+    with Image.open(asset_path(name)) as image:
+        if width is not None and image.width > width:
+            image.thumbnail((width, image.height * width // image.width))
+        buffer = io.BytesIO()
+        image.save(buffer, image_format)
+    return buffer.getvalue()
+
+# Define asset_data_uri()
+@st.cache_resource(show_spinner=False)
+def asset_data_uri(name: str, width: int | None = None) -> str:
+    """Image under assets/ as a WebP data: URI, for inline HTML / CSS"""
+    return "data:image/webp;base64," + base64.b64encode(asset_image(name, width, "WEBP")).decode("ascii")
+
+# Define logo()
+def logo(size: str = "card") -> bytes:
+    """JCPAO logo sized for one LOGO_SIZES card (stand-in for missing headshots)"""
+    return asset_image(JCPAO_LOGO, LOGO_SIZES[size])
+
+# Define page_logo()
+def page_logo() -> bytes:
+    """JCPAO logo for st.logo() / the page icon"""
+    return asset_image(JCPAO_LOGO)
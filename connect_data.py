@@ -1,8 +1,24 @@
 import streamlit as st
 import psycopg
-from psycopg_pool import ConnectionPool
+from psycopg import sql
+from psycopg.types import TypeInfo
+from psycopg.types.array import register_array
+from psycopg_pool import ConnectionPool, PoolTimeout
 import pandas as pd
+import numpy as np
+import threading
+import queue
+import atexit
 import time
+import os
+import json
+import traceback
+from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+
+from directory_search import NameIndex, normalize_name
+from directory_facets import FacetIndex
 
 # --- Local .env file ---
 # from dotenv import load_dotenv
@@ -11,6 +27,114 @@ import time
 # conn_string = os.getenv("DATABASE_URL")
 
 
+# --- Register enum[] adapters ---
+
+# Postgres enum types that employee_info_view / active_pets return as arrays
+ENUM_ARRAY_TYPES = ["unit_enum", "race_enum"]
+
+# Define configure_connection()
+def configure_connection(conn: psycopg.Connection):
+    """Register list loaders for enum[] columns, so 'Assigned Unit' / 'Race' load as lists instead of '{a,b}' strings"""
+    for type_name in ENUM_ARRAY_TYPES:
+        info = TypeInfo.fetch(conn, type_name)
+        if info is not None: # Type doesn't exist in this database -- leave as text
+            register_array(info, conn)
+    conn.commit() # Pool requires connections to be returned idle
+
+
+# --- Pool instrumentation ---
+
+# Process-wide pool measurements (module state, so background threads can record without a script run)
+POOL_MONITOR = {
+    "lock": threading.Lock(),
+    "checkouts": 0,
+    "checkout_ms": deque(maxlen=1000), # Recent wait-for-connection samples
+    "usage_ms": deque(maxlen=1000), # Recent connection hold-time samples
+    "timeouts": 0,
+    "reconnect_failures": 0,
+    "warmup_ms": None,
+}
+
+# Seconds to wait for the pool's min_size connections during warm-up (covers a suspended Neon compute waking up)
+POOL_WARMUP_TIMEOUT = 30
+
+# Define record_pool_event()
+def record_pool_event(name: str, value: float | None = None):
+    """Add a sample (checkout_ms / usage_ms) or bump a counter (timeouts / reconnect_failures) in POOL_MONITOR"""
+    with POOL_MONITOR["lock"]:
+        if value is None:
+            POOL_MONITOR[name] += 1
+        else:
+            POOL_MONITOR[name].append(value)
+
+# Define pool_connection()
+@contextmanager
+def pool_connection(pool: ConnectionPool):
+    """pool.connection() that records checkout latency, hold time and timeouts"""
+    requested = time.perf_counter()
+    try:
+        with pool.connection() as conn:
+            acquired = time.perf_counter()
+            record_pool_event("checkout_ms", (acquired - requested) * 1000)
+            try:
+                yield conn
+            finally:
+                record_pool_event("usage_ms", (time.perf_counter() - acquired) * 1000)
+    except PoolTimeout:
+        record_pool_event("timeouts")
+        raise
+
+# Define warm_up_pool()
+def warm_up_pool(pool: ConnectionPool):
+    """Wait (in the background) until min_size connections are open, and record how long that took"""
+    started = time.perf_counter()
+    try:
+        pool.wait(timeout=POOL_WARMUP_TIMEOUT)
+        POOL_MONITOR["warmup_ms"] = (time.perf_counter() - started) * 1000
+    except PoolTimeout:
+        record_pool_event("timeouts")
+
+# Define get_pool_metrics()
+def get_pool_metrics(pool: ConnectionPool | None = None) -> dict:
+    """
+    Snapshot of pool behaviour for sizing: current size / idle / waiting connections, cumulative
+    requests, wait time, timeouts, lost and failed connections (psycopg_pool stats), plus
+    p50 / p95 / max checkout latency and hold time over the recent samples.
+    """
+    if pool is None:
+        pool = get_db_connection()
+
+    stats = pool.get_stats() if pool is not None else {}
+
+    with POOL_MONITOR["lock"]:
+        checkout_ms = np.array(POOL_MONITOR["checkout_ms"])
+        usage_ms = np.array(POOL_MONITOR["usage_ms"])
+        metrics = {
+            "pool_min": stats.get("pool_min"),
+            "pool_max": stats.get("pool_max"),
+            "pool_size": stats.get("pool_size"),
+            "pool_available": stats.get("pool_available"),
+            "requests_waiting": stats.get("requests_waiting", 0),
+            "requests_num": stats.get("requests_num", 0),
+            "requests_wait_ms": stats.get("requests_wait_ms", 0),
+            "requests_errors": stats.get("requests_errors", 0), # Pool-side timeouts / rejections
+            "connections_num": stats.get("connections_num", 0), # Connections opened (incl. reconnects)
+            "connections_ms": stats.get("connections_ms", 0),
+            "connections_errors": stats.get("connections_errors", 0),
+            "connections_lost": stats.get("connections_lost", 0), # Failed the checkout check / returned broken
+            "timeouts": POOL_MONITOR["timeouts"],
+            "reconnect_failures": POOL_MONITOR["reconnect_failures"],
+            "warmup_ms": POOL_MONITOR["warmup_ms"],
+        }
+
+    for name, samples in [("checkout_ms", checkout_ms), ("usage_ms", usage_ms)]:
+        metrics[f"{name}_p50"] = float(np.percentile(samples, 50)) if samples.size else None
+        metrics[f"{name}_p95"] = float(np.percentile(samples, 95)) if samples.size else None
+        metrics[f"{name}_max"] = float(samples.max()) if samples.size else None
+
+    return metrics
+
+
 # --- Initialize database connection pool ---
 
 # Define get_database_session() 
@@ -22,10 +146,15 @@ def get_database_session(database_url: str):
             conninfo=database_url, 
             min_size=1, 
             max_size=10,
+            open=True, # start connecting now, in the pool's background workers
             max_lifetime=300, # recycle connections every 300 seconds
             max_idle=60, # close idle connections after 60 seconds
-            timeout=10 # wait 10 seconds to connect
+            timeout=10, # wait 10 seconds to connect
+            configure=configure_connection, # register enum[] loaders on every new connection
+            check=ConnectionPool.check_connection, # validate connections on checkout (drops stale SSL connections)
+            reconnect_failed=lambda pool: record_pool_event("reconnect_failures"),
         ) # Initialize connection pool
+        threading.Thread(target=warm_up_pool, args=(pool,), daemon=True).start()
         return pool
     except psycopg.OperationalError as e:
         st.error(
@@ -34,11 +163,10 @@ def get_database_session(database_url: str):
         )
         return None
 
-# Establish NEON database connection (via psycopg3)
-database_url = st.secrets["neonDB"]["database_url"]
-
-# Attempt connection
-db_connection = get_database_session(database_url)
+# Define get_db_connection()
+def get_db_connection() -> ConnectionPool | None:
+    """Establish NEON database connection (via psycopg3) on first use, so importing this module never touches the database"""
+    return get_database_session(st.secrets["neonDB"]["database_url"])
 
 
 # --- Define helper functions ---
@@ -46,11 +174,68 @@ db_connection = get_database_session(database_url)
 # Define parse_enum()
 def parse_enum(array):
     """Return enum array dtypes in a workable format"""
+    if isinstance(array, list): # Already decoded by the enum[] loaders
+        return array
+    if isinstance(array, np.ndarray): # Read back from a Parquet snapshot
+        return array.tolist()
     if pd.isna(array):
         return []
     array = array.strip('{}')
     return array.split(',') if array else []
 
+# --- Typed snapshot columns ---
+
+# Enum values of unit_enum / race_enum, in bit order for the "Unit Mask" / "Race Mask" columns
+UNIT_CODES = ['Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD', 'WARRANT']
+RACE_CODES = ['W', 'B', 'A', 'H', 'AIAN', 'NHPI', 'O']
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORY_COLUMNS = ["Position", "Office Location", "Sex"]
+
+# Define enum_codes()
+def enum_codes(values: pd.Series, codes: list) -> list:
+    """codes plus any other values in a column of enum lists (an enum value added in Postgres but not to UNIT_CODES / RACE_CODES)"""
+    extra = set(values.explode().dropna()) - set(codes)
+    return codes + sorted(extra, key=str)
+
+# Define enum_mask()
+def enum_mask(values: pd.Series, codes: list) -> pd.Series:
+    """Encode a column of enum lists as an integer bitmask (bit i is set when codes[i] is in the list; other values set no bit)"""
+    exploded = values.explode().rename("code").rename_axis("row").reset_index().drop_duplicates()
+    bits = exploded["code"].map({code: 1 << i for i, code in enumerate(codes)}).fillna(0).astype("int64")
+    return bits.groupby(exploded["row"]).sum().reindex(values.index, fill_value=0)
+
+# Define type_snapshot()
+def type_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a raw employee_info_view / active_pets / directory frame to compact dtypes:
+    categorical Position / Office Location / Sex, small-int DOB Month / DOB Day,
+    and "Unit Mask" / "Race Mask" bitmask columns next to the enum lists (kept for display).
+    """
+    if df.empty:
+        return df
+
+    df = df.copy()
+
+    for col in ["Assigned Unit", "Race"]:
+        if col in df.columns:
+            df[col] = df[col].apply(parse_enum)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col in ["DOB Month", "DOB Day"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int8")
+
+    if "Assigned Unit" in df.columns:
+        df["Unit Mask"] = enum_mask(df["Assigned Unit"], UNIT_CODES).astype("int16")
+    if "Race" in df.columns:
+        df["Race Mask"] = enum_mask(df["Race"], RACE_CODES).astype("int8")
+
+    return df
+
 # Define display_personal_name()
 # def display_personal_name(pref_name, first_name):
 #     if not pref_name:
@@ -108,59 +293,62 @@ def parse_month(type: str, value: str = None):
     elif type == "format_func":
         return lambda x: months_dict[x]
 
-# --- Define function to read tables from Neon DB ---
+# --- Change token ---
 
-@st.cache_data
-def query_table(sql_query: str, _connection: ConnectionPool = db_connection) -> pd.DataFrame:
-    if _connection is None:
-        return pd.DataFrame()
-    
-    try:
-        if isinstance(_connection, ConnectionPool):
-            with _connection.connection() as conn:
-                df = pd.read_sql(sql_query, conn)
+# Seconds between change-token checks (one cheap catalog query per check)
+CHANGE_TOKEN_TTL = 30
 
-        else:
-            df = pd.read_sql(sql_query, _connection)
+# Tables whose writes don't affect the directory (user_activity changes on every login)
+CHANGE_TOKEN_EXCLUDED = ["user_activity"]
 
-        return df
-    
-    except psycopg.OperationalError as e:
-        st.error(f"Database query failed: {e}")
-        return pd.DataFrame()
-
-# --- Query tables ---
-
-# Get main STAFF_VIEW table
-staff_view = query_table("SELECT * FROM employee_info_view")
-
-if staff_view.empty:
-    staff_view = pd.DataFrame()
-else:
-    staff_view["Assigned Unit"] = staff_view["Assigned Unit"].apply(parse_enum)
-    staff_view["Race"] = staff_view["Race"].apply(parse_enum)
+# Define read_change_token()
+def read_change_token(_connection: ConnectionPool | None = None) -> tuple | None:
+    """
+    Return a cheap fingerprint of the directory data: the total inserted / updated / deleted row
+    counters of the user tables behind employee_info_view and active_pets (pg_stat_user_tables).
+    Any committed write changes the token; reading it never scans the tables themselves.
+    Returns None if the database can't be reached.
+    """
+    if _connection is None:
+        _connection = get_db_connection()
+    if _connection is None:
+        return None
 
-STAFF_VIEW = staff_view.copy()
+    try:
+        with pool_connection(_connection) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT coalesce(sum(n_tup_ins), 0), coalesce(sum(n_tup_upd), 0), coalesce(sum(n_tup_del), 0) "
+                    "FROM pg_stat_user_tables WHERE NOT (relname = ANY(%s))",
+                    (CHANGE_TOKEN_EXCLUDED,),
+                )
+                return tuple(int(value) for value in cur.fetchone())
 
-# Get office PETS table 
-pets = query_table("SELECT * FROM active_pets")
-if pets.empty:
-    pets = pd.DataFrame()
-else:
-    pets["Assigned Unit"] = pets["Assigned Unit"].apply(parse_enum)
+    except psycopg.Error:
+        return None
 
-PETS = pets.copy()
+# Define get_change_token()
+@st.cache_data(ttl=CHANGE_TOKEN_TTL, show_spinner=False)
+def get_change_token(_connection: ConnectionPool | None = None) -> tuple | None:
+    """read_change_token(), re-read at most every CHANGE_TOKEN_TTL seconds"""
+    return read_change_token(_connection)
 
 # Merge STAFF_VIEW and PETS table for staff directory
 
 def directory_df_merge(
-    pet_df: pd.DataFrame = pets.copy(), 
-    staff_df: pd.DataFrame = staff_view.copy()
+    pet_df: pd.DataFrame, 
+    staff_df: pd.DataFrame,
+    contacts_df: pd.DataFrame | None = None
 ) -> pd.DataFrame:
     """
     Merge pet df and staff df together to display internal staff directory
+    (pets take their owner's contact details from contacts_df, default staff_df)
     """
 
+    if contacts_df is None:
+        contacts_df = staff_df
+
+    pet_df = pet_df.copy() # Don't rename the caller's (cached) frame in place
     pet_df.rename(
         columns={
             "Pet Full Name": "Full Name", 
@@ -196,7 +384,7 @@ def directory_df_merge(
     for col in new_cols:
         pet_df[col] = None
 
-    pet_df = pet_df.merge(staff_df[["Work Email Address", "Work Phone #", "Personal Phone #", "Personal Email Address"]].copy(), how="left", on="Work Email Address")
+    pet_df = pet_df.merge(contacts_df[["Work Email Address", "Work Phone #", "Personal Phone #", "Personal Email Address"]].copy(), how="left", on="Work Email Address")
 
     # Rearrange pet_df cols in staff_df col order 
     pet_df = pet_df[[
@@ -231,61 +419,730 @@ def directory_df_merge(
 
     return merge_df
 
-STAFF_DIRECTORY = directory_df_merge()
+# Define fetch_frame()
+def fetch_frame(
+    sql_query: str | sql.Composable, 
+    params: tuple | list | dict | None = None, 
+    prepare: bool = False, 
+    _connection: ConnectionPool | None = None
+) -> pd.DataFrame:
+    """Run an uncached (optionally parameterized / server-side prepared) query; raises psycopg errors to the caller"""
+    if _connection is None:
+        _connection = get_db_connection()
+    if _connection is None:
+        raise psycopg.OperationalError("No database connection pool")
+    with pool_connection(_connection) as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql_query, params, prepare=prepare or None) # None: psycopg's automatic prepare threshold
+            columns = [col.name for col in cur.description]
+            return pd.DataFrame.from_records(cur.fetchall(), columns=columns, coerce_float=True)
+
+# --- Snapshot store (full / delta sync) ---
+
+# "delta" re-reads only rows whose content changed since the last sync; "full" re-reads both tables
+SNAPSHOT_SYNC_MODE = "delta"
+
+# Row key of each snapshot source. Neither view has a last-modified column, so delta sync compares an md5
+# of each whole row (computed by Postgres, keys + hashes only) with the hashes of the rows already loaded.
+# Computed columns count too: "Service (days)" moves daily, so the first sync of a day re-reads every staff row.
+SNAPSHOT_SOURCES = {
+    "staff": {"table": "employee_info_view", "key": ["Work Email Address"]},
+    "pets": {"table": "active_pets", "key": ["Work Email Address", "Pet Full Name"]},
+}
+
+ROW_HASH = "Row Hash"
+
+# Last good snapshot on local disk, served immediately by a fresh process while it reconciles with the database.
+# Holds staff contact details -- keep it out of git (see .gitignore) and off shared volumes.
+SNAPSHOT_DIR = Path(".cache/snapshot")
+SNAPSHOT_FRAMES = ["staff", "pets", "directory"]
+
+# Define new_snapshot()
+def new_snapshot(version: int, staff: pd.DataFrame, pets: pd.DataFrame, directory: pd.DataFrame) -> dict:
+    """
+    One immutable snapshot: the three frames, a version counter, "frame" (the directory, as this
+    snapshot's view for the staff page) and "derived" (indexes built once per snapshot, see derived()).
+    Syncs swap in a whole new snapshot, so readers always see frames and indexes that belong together.
+    """
+    return {
+        "version": version,
+        "staff": staff,
+        "pets": pets,
+        "directory": directory,
+        "frame": directory,
+        "derived": { # Built here, at load, off the search / filter path
+            "name_index": NameIndex(directory),
+            "facet_index": FacetIndex(directory),
+        },
+    }
+
+# Define derived()
+def derived(view: dict, name: str, build):
+    """Value computed once per snapshot / projection view (e.g. a search or facet index) and dropped with it"""
+    if name not in view["derived"]:
+        view["derived"][name] = build() # Two sessions may race to build it -- both results are identical
+    return view["derived"][name]
+
+# Define save_snapshot()
+def save_snapshot(store: dict):
+    """Persist the snapshot frames as Parquet (best effort -- a read-only disk just means no warm start)"""
+    try:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        for name in SNAPSHOT_FRAMES:
+            tmp_path = SNAPSHOT_DIR / f"{name}.parquet.tmp"
+            store["current"][name].to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, SNAPSHOT_DIR / f"{name}.parquet") # Atomic, so readers never see half a file
+        for source, hashes in store["hashes"].items():
+            hashes.index.to_frame(index=False).assign(**{ROW_HASH: hashes.values}).to_parquet(SNAPSHOT_DIR / f"{source}_hashes.parquet", index=False)
+        (SNAPSHOT_DIR / "meta.json").write_text(json.dumps({"token": store["token"]}))
+    except (OSError, ValueError, TypeError, ImportError):
+        pass
+
+# Define load_saved_snapshot()
+def load_saved_snapshot(store: dict) -> bool:
+    """Load the last persisted snapshot into an empty store; returns True if one was found"""
+    try:
+        frames = {name: pd.read_parquet(SNAPSHOT_DIR / f"{name}.parquet") for name in SNAPSHOT_FRAMES}
+        meta = json.loads((SNAPSHOT_DIR / "meta.json").read_text())
+    except (OSError, ValueError, TypeError, ImportError):
+        return False
+
+    for df in frames.values():
+        for col in ["Assigned Unit", "Race"]:
+            if col in df.columns:
+                df[col] = df[col].apply(parse_enum)
+
+    store["current"] = new_snapshot(1, **frames)
+    store["token"] = tuple(meta["token"]) if meta.get("token") else None
+    try: # Without saved row hashes the first sync is a full reload
+        store["hashes"] = {
+            source: row_hashes(pd.read_parquet(SNAPSHOT_DIR / f"{source}_hashes.parquet"), source) for source in SNAPSHOT_SOURCES
+        }
+    except (OSError, ValueError, KeyError):
+        pass
+    return True
+
+# Define get_snapshot_store()
+@st.cache_resource
+def get_snapshot_store() -> dict:
+    """Process-wide snapshot shared by all sessions (store["current"] is replaced, never mutated, on sync)"""
+    store = {
+        "lock": threading.Lock(),
+        "token": None,
+        "current": new_snapshot(0, pd.DataFrame(), pd.DataFrame(), pd.DataFrame()), # Version 0: not loaded yet
+        "hashes": {"staff": None, "pets": None}, # Row hashes of the loaded frames (see row_hashes())
+        "error": None, # Last sync error, shown by get_snapshot()
+        "warming": False, # Serving the on-disk snapshot while reconcile_snapshot() runs
+    }
+    if load_saved_snapshot(store):
+        # Warm start: serve the saved frames now, reconcile with the database in the background
+        get_db_connection() # Open the pool here, inside the script run, before the thread needs it
+        store["warming"] = True
+        threading.Thread(target=reconcile_snapshot, args=(store,), daemon=True).start()
+    return store
+
+# Define reconcile_snapshot()
+def reconcile_snapshot(store: dict):
+    """Background sync of a warm-started store (no Streamlit calls -- runs outside any script run)"""
+    try:
+        sync_snapshot(store, read_change_token())
+    finally:
+        store["warming"] = False
+
+# Define row_keys()
+def row_keys(df: pd.DataFrame, source: str) -> pd.MultiIndex:
+    """Key index of the rows in df"""
+    return pd.MultiIndex.from_frame(df[SNAPSHOT_SOURCES[source]["key"]].astype(str))
+
+# Define unique_keys()
+def unique_keys(df: pd.DataFrame, source: str) -> bool:
+    """True if every row of df has its own non-null key (delta sync can only patch rows it can tell apart)"""
+    keys = df[SNAPSHOT_SOURCES[source]["key"]]
+    return not keys.isna().any(axis=None) and not keys.duplicated().any()
+
+# Define row_hash_query()
+def row_hash_query(source: str, columns: str = "src.*", where: str = "TRUE") -> str:
+    """SELECT from a snapshot source, with each row's md5 (over all of its columns) as "Row Hash" """
+    return f'SELECT {columns}, md5(src::text) AS "{ROW_HASH}" FROM {SNAPSHOT_SOURCES[source]["table"]} AS src WHERE {where}'
+
+# Define row_hashes()
+def row_hashes(df: pd.DataFrame, source: str) -> pd.Series:
+    """"Row Hash" column of df, indexed by row key"""
+    return pd.Series(df[ROW_HASH].values, index=row_keys(df, source), dtype=object)
+
+# Define patch_frame()
+def patch_frame(df: pd.DataFrame, changed: pd.DataFrame, live_keys: pd.MultiIndex, source: str) -> pd.DataFrame:
+    """Drop deactivated and changed rows from df, then append the (typed) changed rows"""
+    keys = row_keys(df, source)
+    keep = keys.isin(live_keys) & ~keys.isin(row_keys(changed, source))
+    patched = pd.concat([df[keep], changed], ignore_index=True)
+
+    # Concatenating categoricals with different categories falls back to object
+    for col in CATEGORY_COLUMNS:
+        if col in patched.columns and patched[col].dtype != "category":
+            patched[col] = patched[col].astype("category")
+
+    return patched
+
+# Define full_sync()
+def full_sync(store: dict) -> tuple[dict, dict]:
+    """Re-read both tables and rebuild the directory; returns the new frames and their row hashes"""
+    staff = fetch_frame(row_hash_query("staff"))
+    pets = fetch_frame(row_hash_query("pets"))
+    hashes = {"staff": row_hashes(staff, "staff"), "pets": row_hashes(pets, "pets")}
+
+    staff = type_snapshot(staff.drop(columns=ROW_HASH))
+    pets = type_snapshot(pets.drop(columns=ROW_HASH))
+    directory = type_snapshot(directory_df_merge(pets, staff)) if not staff.empty else staff
+
+    return {"staff": staff, "pets": pets, "directory": directory}, hashes
+
+# Define delta_sync()
+def delta_sync(store: dict) -> tuple[dict | None, dict]:
+    """
+    Fetch every row's key and hash, then only the rows whose hash differs from the loaded one, and patch them
+    into copies of the staff / pets / directory frames. Returns the new frames (None if nothing changed) and row hashes.
+    Falls back to full_sync() if a key is null or shared by several rows, in the database or the loaded frames.
+    """
+    current = store["current"]
+    frames = {"staff": current["staff"], "pets": current["pets"]}
+    hashes = dict(store["hashes"])
+    changed_emails = set()
+
+    for source in ["staff", "pets"]:
+        live = fetch_frame(row_hash_query(source, quote_columns(SNAPSHOT_SOURCES[source]["key"])))
+        df = frames[source]
+        if not (unique_keys(live, source) and unique_keys(df, source)):
+            return full_sync(store) # Patching by key could drop or duplicate rows
+
+        live = row_hashes(live, source)
+        known = hashes[source].reindex(live.index)
+        unchanged = known.values == live.values # New keys (NaN) count as changed
+
+        removed = df[~row_keys(df, source).isin(live.index)]
+        if removed.empty and unchanged.all():
+            continue
+
+        # A row edited again between the two queries isn't returned -- it keeps no hash, so the next sync re-reads it
+        changed = fetch_frame(row_hash_query(source, where='md5(src::text) = ANY(%s)'), (live[~unchanged].unique().tolist(),))
+        hashes[source] = pd.concat([live[unchanged], row_hashes(changed, source)])
+        hashes[source] = hashes[source][~hashes[source].index.duplicated(keep="last")]
+        changed = type_snapshot(changed.drop(columns=ROW_HASH))
+
+        frames[source] = patch_frame(df, changed, live.index, source)
+        changed_emails.update(removed["Work Email Address"])
+        changed_emails.update(changed["Work Email Address"])
+
+    if not changed_emails:
+        return None, hashes
+
+    # Rebuild only the directory rows of affected staff (pets share their owner's work email)
+    staff = frames["staff"]
+    pets = frames["pets"]
+    directory = current["directory"]
+    affected_staff = staff[staff["Work Email Address"].isin(changed_emails)]
+    affected_pets = pets[pets["Work Email Address"].isin(changed_emails)]
+    rebuilt = type_snapshot(directory_df_merge(affected_pets, affected_staff))
+
+    directory = pd.concat([directory[~directory["Work Email Address"].isin(changed_emails)], rebuilt], ignore_index=True)
+    directory.sort_values(by=["Last Name", "First Name"], ascending=[True, True], inplace=True, ignore_index=True)
+    for col in CATEGORY_COLUMNS:
+        if directory[col].dtype != "category":
+            directory[col] = directory[col].astype("category")
+    frames["directory"] = directory
+
+    return frames, hashes
+
+# Define sync_snapshot()
+def sync_snapshot(store: dict, change_token: tuple | None, mode: str = SNAPSHOT_SYNC_MODE):
+    """Bring the shared snapshot up to date with change_token (no-op if it already is)"""
+    with store["lock"]:
+        current = store["current"]
+        if current["version"] and store["token"] == change_token:
+            return
+
+        try:
+            can_delta = (
+                mode == "delta" 
+                and current["version"] 
+                and all(store["hashes"][source] is not None for source in SNAPSHOT_SOURCES)
+            )
+            frames, hashes = delta_sync(store) if can_delta else full_sync(store)
+
+        except psycopg.Error as e:
+            store["error"] = e
+            return
+
+        store["error"] = None
+        store["token"] = change_token
+        store["hashes"] = hashes
+        if frames is not None:
+            store["current"] = new_snapshot(current["version"] + 1, **frames)
+            save_snapshot(store)
+
+# Define get_snapshot()
+def get_snapshot() -> dict:
+    """Shared staff / pets / directory snapshot (see new_snapshot()), synced to the current change token"""
+    store = get_snapshot_store()
+
+    # Another session (or the warm-start thread) is already syncing -- serve the current frames rather than wait
+    if store["current"]["version"] and (store["warming"] or store["lock"].locked()):
+        return store["current"]
+
+    sync_snapshot(store, get_change_token())
+    if store["error"] is not None:
+        st.error(f"Database query failed: {store['error']}")
+    return store["current"]
+
+# --- Per-page projections ---
+# Pages that don't show the full directory load only the columns (and rows) they display,
+# each cached per change token, so sensitive columns never reach them.
+
+# Define quote_columns()
+def quote_columns(columns: list) -> str:
+    """Comma-separated, double-quoted column list for a SELECT"""
+    return ", ".join(f'"{col}"' for col in columns)
+
+NAME_COLUMNS = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
+
+COURT_COLUMNS = NAME_COLUMNS + ['Job Title', 'Position', 'Assigned Unit', 'Office Location', 'Work Email Address', 'Work Phone #', 'PhotoID']
+
+PROJECTIONS = {
+    # Court-view directory: attorneys only, work contact details only
+    "court": (
+        f"SELECT {quote_columns(COURT_COLUMNS)} "
+        "FROM employee_info_view WHERE \"Position\" IN ('Exec', 'CTA', 'TTL', 'APA')"
+    ),
+    # Staff birthdays: names, DOB and photo of staff + pets (same column mapping as directory_df_merge)
+    "birthdays": (
+        f"SELECT {quote_columns(['Full Name', 'First Name', 'Last Name', 'Preferred Name', 'DOB', 'DOB Month', 'DOB Day', 'PhotoID'])} "
+        "FROM employee_info_view "
+        "UNION ALL "
+        f"SELECT {quote_columns(['Pet Full Name', 'Pet Pref Name', 'Pet Last Name', 'Pet Pref Name', 'Pet DOB', 'Pet DOB Month', 'Pet DOB Day', 'Pet PhotoID'])} "
+        "FROM active_pets"
+    ),
+    # Staff dashboard: aggregate inputs only, no names or contact details
+    "dashboard": (
+        f"SELECT {quote_columns(['Position', 'Assigned Unit', 'Office Location', 'Service (days)', 'Race', 'Sex'])} "
+        "FROM employee_info_view"
+    ),
+}
+
+# Sort order applied once at load, so row positions in derived indexes match what the page displays
+PROJECTION_SORT = {
+    "court": ["Last Name", "First Name"],
+    "birthdays": ["DOB Month", "DOB Day", "Last Name"],
+}
+
+# Define load_projection()
+@st.cache_resource(max_entries=16, show_spinner=False) # One shared view per (projection, change token)
+def load_projection(name: str, change_token: tuple | None) -> dict:
+    """Query and type one projection into a {"version", "frame", "derived"} view (raises psycopg errors, so failures aren't cached)"""
+    frame = type_snapshot(fetch_frame(PROJECTIONS[name]))
+    if name in PROJECTION_SORT and not frame.empty:
+        frame.sort_values(by=PROJECTION_SORT[name], inplace=True, ignore_index=True)
+    return {"version": change_token, "frame": frame, "derived": {}}
+
+# Define get_projection_view()
+def get_projection_view(name: str) -> dict:
+    """Projection view for the current change token (an empty, uncached view if the query fails)"""
+    try:
+        return load_projection(name, get_change_token())
+    except psycopg.Error as e:
+        st.error(f"Database query failed: {e}")
+        return {"version": None, "frame": pd.DataFrame(), "derived": {}}
+
+# Define get_projection()
+def get_projection(name: str) -> pd.DataFrame:
+    """Typed projection "court" / "birthdays" / "dashboard" for the current change token (shared -- copy before mutating)"""
+    return get_projection_view(name)["frame"]
+
+# Define get_directory_view()
+def get_directory_view(view: str) -> dict:
+    """{"version", "frame", "derived"} of the "staff" directory (full snapshot) or the "court" projection"""
+    return get_snapshot() if view == "staff" else get_projection_view(view)
+
+# Define get_name_index()
+def get_name_index(view: dict) -> NameIndex:
+    """Name search index of a directory view (built once per snapshot / projection version)"""
+    return derived(view, "name_index", lambda: NameIndex(view["frame"]))
+
+# Define get_facet_index()
+def get_facet_index(view: dict) -> FacetIndex:
+    """Sidebar filter bitsets of a directory view (built once per snapshot / projection version)"""
+    return derived(view, "facet_index", lambda: FacetIndex(view["frame"]))
+
+# Live search: wait this long after the last keystroke before rerunning the page
+SEARCH_DEBOUNCE_MS = 300
+
+# Define search_positions()
+def search_positions(view: dict, searched_text: str, fuzzy: bool = False, search_memo: dict | None = None) -> np.ndarray:
+    """
+    Row positions of a directory view matching the name search (fuzzy: best matches first).
+    search_memo is a per-session dict holding the last search -- a query that extends it (same view
+    version) only re-checks the previous matches instead of searching the whole index.
+    """
+    name_index = get_name_index(view)
+    if fuzzy: # Typo matches don't narrow as the query grows
+        return name_index.fuzzy(searched_text)
+
+    query = normalize_name(searched_text)
+    memo = search_memo if search_memo is not None else {}
+    if memo.get("query") and memo.get("version") == view["version"] and query.startswith(memo["query"]):
+        positions = name_index.refine(memo["positions"], query)
+    else:
+        positions = name_index.search(query)
+    memo.update(version=view["version"], query=query, positions=positions)
+    return positions
+
+# Define filter_positions()
+def filter_positions(
+    view: dict, 
+    filters: dict, 
+    searched_text: str = "", 
+    fuzzy: bool = False, 
+    search_memo: dict | None = None
+) -> np.ndarray:
+    """
+    Row positions of a directory view matching the sidebar filters ({"position": ..., "unit": ...}, "All" = any)
+    and the name search, in display order (fuzzy search: best matches first).
+    """
+    positions = get_facet_index(view).positions(filters)
+    if searched_text:
+        matches = search_positions(view, searched_text, fuzzy, search_memo)
+        if fuzzy:
+            positions = matches[np.isin(matches, positions)]
+        else:
+            positions = np.intersect1d(matches, positions, assume_unique=True)
+    return positions
+
+# --- Per-session selections ---
+# Session state keeps only which rows of the shared view a session's filters picked (a few bytes per row),
+# never a copy of the frame; the rows are materialized when the page renders.
+
+# Define make_selection()
+def make_selection(view: dict, positions: np.ndarray) -> dict:
+    """Per-session filter result: int32 row positions into a shared view, tagged with the view's version"""
+    return {"version": view["version"], "positions": np.asarray(positions, dtype=np.int32)}
+
+# Define selected_frame()
+def selected_frame(view: dict, selection: dict | None, frame: pd.DataFrame | None = None) -> pd.DataFrame | None:
+    """
+    Rows of view picked by selection (or of frame, any per-view frame in the same row order, e.g. display
+    records); None if there is no selection or it's from another version (re-filter)
+    """
+    if not selection or "positions" not in selection or selection["version"] != view["version"]:
+        return None
+    frame = view["frame"] if frame is None else frame
+    return frame.iloc[selection["positions"]].reset_index(drop=True)
+
+# --- Query pushdown (server-side directory filters) ---
+# Optional mode for directories too large for one in-memory frame per process: the sidebar filters
+# become parameterized, prepared SQL, and each filter combination is cached per change token.
+# Enable with query_pushdown = true under [neonDB] in secrets.toml.
+
+# Owner contact columns copied onto pet rows
+CONTACT_COLUMNS = ["Work Email Address", "Work Phone #", "Personal Phone #", "Personal Email Address"]
+
+# Filterable columns of each table / projection: (position, unit, location, month, name columns).
+# None: the source doesn't have that column, so the filter doesn't apply (as with FacetIndex).
+FILTER_COLUMNS = {
+    "employee_info_view": ("Position", "Assigned Unit", "Office Location", "DOB Month", NAME_COLUMNS),
+    "active_pets": (None, "Assigned Unit", "Office Location", "Pet DOB Month", ["Pet Full Name", "Pet Last Name", "Pet Pref Name"]),
+}
+
+# Define projection_filter_columns()
+def projection_filter_columns(columns: list) -> tuple:
+    """FILTER_COLUMNS entry of an employee_info_view projection: only the filter columns it selects"""
+    *facets, names = FILTER_COLUMNS["employee_info_view"]
+    return (*(col if col in columns else None for col in facets), [col for col in names if col in columns])
+
+FILTER_COLUMNS["court"] = projection_filter_columns(COURT_COLUMNS) # No "DOB Month"
+
+# Define query_pushdown_enabled()
+def query_pushdown_enabled() -> bool:
+    """True if directory filters should run in Postgres instead of pandas"""
+    return bool(st.secrets["neonDB"].get("query_pushdown", False))
+
+# Define like_pattern()
+def like_pattern(text: str) -> str:
+    """ILIKE pattern matching text anywhere (LIKE wildcards in text are escaped)"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+# Define filter_conditions()
+def filter_conditions(table: str, filters: tuple) -> tuple[sql.Composable, dict]:
+    """WHERE clause + parameters for (position, unit, location, month, searched_text) against table"""
+    position, unit, location, month, searched_text = filters
+    position_col, unit_col, location_col, month_col, name_cols = FILTER_COLUMNS[table]
+    conditions = [sql.SQL("TRUE")]
+    params = {}
+
+    if position != "All" and position_col:
+        conditions.append(sql.SQL("{} = %(position)s").format(sql.Identifier(position_col)))
+        params["position"] = position
+    if unit != "All" and unit_col:
+        conditions.append(sql.SQL("%(unit)s = ANY({})").format(sql.Identifier(unit_col)))
+        params["unit"] = unit
+    if location != "All" and location_col:
+        conditions.append(sql.SQL("{} = %(location)s").format(sql.Identifier(location_col)))
+        params["location"] = location
+    if month != "All" and month_col:
+        conditions.append(sql.SQL("{} = %(month)s").format(sql.Identifier(month_col)))
+        params["month"] = int(month)
+    if searched_text and name_cols:
+        conditions.append(sql.SQL("({})").format(sql.SQL(" OR ").join(
+            sql.SQL("{} ILIKE %(name)s").format(sql.Identifier(col)) for col in name_cols
+        )))
+        params["name"] = like_pattern(searched_text)
+
+    return sql.SQL(" AND ").join(conditions), params
+
+# Define load_filtered()
+@st.cache_resource(max_entries=256, show_spinner=False) # One shared frame per (view, filter tuple, change token)
+def load_filtered(view: str, filters: tuple, change_token: tuple | None) -> pd.DataFrame:
+    """Run the filtered "staff" (staff + pets) or "court" query (raises psycopg errors, so failures aren't cached)"""
+    if view == "court":
+        where, params = filter_conditions("court", filters)
+        staff = fetch_frame(
+            sql.SQL("SELECT * FROM ({}) AS court WHERE {}").format(sql.SQL(PROJECTIONS["court"]), where),
+            params, prepare=True
+        )
+        staff.sort_values(by=["Last Name", "First Name"], ascending=[True, True], inplace=True, ignore_index=True)
+        return type_snapshot(staff)
+
+    # 'PET' isn't a position_enum value -- pets live in active_pets only
+    where, params = filter_conditions("employee_info_view", filters)
+    position = filters[0]
+    staff = pd.DataFrame()
+    if position != "PET":
+        staff = fetch_frame(sql.SQL("SELECT * FROM employee_info_view WHERE {}").format(where), params, prepare=True)
+    if position not in ("All", "PET"):
+        staff.sort_values(by=["Last Name", "First Name"], ascending=[True, True], inplace=True, ignore_index=True)
+        return type_snapshot(staff)
+
+    pet_where, pet_params = filter_conditions("active_pets", filters)
+    pets = fetch_frame(sql.SQL("SELECT * FROM active_pets WHERE {}").format(pet_where), pet_params, prepare=True)
+    contacts = fetch_frame(
+        sql.SQL("SELECT {} FROM employee_info_view WHERE {} = ANY(%s)").format(
+            sql.SQL(quote_columns(CONTACT_COLUMNS)), sql.Identifier("Work Email Address")
+        ),
+        (pets["Work Email Address"].dropna().unique().tolist(),),
+    )
+    return type_snapshot(directory_df_merge(type_snapshot(pets), type_snapshot(staff), contacts))
+
+# Define query_directory()
+def query_directory(
+    view: str, 
+    position: str = "All", 
+    unit: str = "All", 
+    location: str = "All", 
+    month: str = "All", 
+    searched_text: str = ""
+) -> pd.DataFrame:
+    """Filtered "staff" or "court" directory from Postgres (shared cached frame -- copy before mutating)"""
+    filters = (position, unit, location, month, searched_text.strip().lower())
+    try:
+        return load_filtered(view, filters, get_change_token())
+    except psycopg.Error as e:
+        st.error(f"Database query failed: {e}")
+        return pd.DataFrame()
+
+# --- Headshot PhotoIDs ---
+
+# Written after bulk headshot uploads (see photo.upload_photos()). employee_info_view has computed columns,
+# so it isn't updatable: the update goes to its base table, named under [neonDB] in secrets.toml --
+# photo_id_table (optionally schema-qualified), photo_id_column ("PhotoID") and photo_id_key ("Work Email Address").
+# PhotoIDs aren't saved until all three are set. Pets live in their own table, so pet rows can't be updated here.
+PHOTO_ID_SETTINGS = ["photo_id_table", "photo_id_column", "photo_id_key"]
+
+# Define photo_id_update()
+def photo_id_update() -> sql.Composed:
+    """UPDATE statement for (photo_id, work_email) rows, from the [neonDB] photo_id_* settings (ValueError if any is unset)"""
+    settings = st.secrets["neonDB"]
+    missing = [name for name in PHOTO_ID_SETTINGS if not settings.get(name)]
+    if missing:
+        raise ValueError(f"Set {', '.join(missing)} under [neonDB] in secrets.toml to save PhotoIDs")
+    return sql.SQL("UPDATE {table} SET {column} = %s WHERE {key} = %s").format(
+        table=sql.Identifier(*settings["photo_id_table"].split(".")),
+        column=sql.Identifier(settings["photo_id_column"]),
+        key=sql.Identifier(settings["photo_id_key"]),
+    )
+
+# Define update_photo_ids()
+def update_photo_ids(rows: list) -> int:
+    """
+    Set PhotoID for (photo_id, work_email) employee rows in one transaction -- all or none; returns the rows updated.
+    Raises ValueError (nothing written) if a PhotoID is a pet's: pets share their owner's work email, or if the
+    photo_id_* settings are unset or name a table / column that doesn't exist.
+    """
+    update = photo_id_update()
+    pool = get_db_connection()
+    if pool is None:
+        raise psycopg.OperationalError("No database connection")
+    with pool_connection(pool) as conn: # Commits on exit, rolls back if any row fails
+        with conn.cursor() as cur:
+            cur.execute('SELECT "Pet PhotoID" FROM active_pets WHERE "Pet PhotoID" = ANY(%s)', ([photo_id for photo_id, _ in rows],))
+            pet_photo_ids = sorted(row[0] for row in cur.fetchall())
+            if pet_photo_ids:
+                raise ValueError(f"Pet PhotoIDs can't be saved on their owners' rows: {', '.join(pet_photo_ids)}")
+            try:
+                cur.executemany(update, rows)
+            except (psycopg.errors.UndefinedTable, psycopg.errors.UndefinedColumn) as e:
+                raise ValueError(f"Check photo_id_table / photo_id_column / photo_id_key under [neonDB] in secrets.toml: {e.diag.message_primary}")
+            return cur.rowcount
 
 # --- Log activity --- 
 
+# Activity rows waiting for the background writer (bounded, so a database outage can't grow memory without limit)
+ACTIVITY_QUEUE_SIZE = 1000
+ACTIVITY_BATCH_SIZE = 100
+ACTIVITY_FLUSH_INTERVAL = 2 # seconds to gather a batch before writing it
+
+# Rows that couldn't be written (database unreachable / queue full); replayed on the next successful flush.
+# Note: replayed rows get user_activity's default timestamp at replay time.
+ACTIVITY_SPOOL = Path(".cache/user_activity_spool.jsonl")
+
+# Rows Postgres rejected (bad data / constraint violations) -- kept for inspection, never replayed
+ACTIVITY_REJECTED = Path(".cache/user_activity_rejected.jsonl")
+
+ACTIVITY_INSERT = "INSERT INTO user_activity (work_email, activity) VALUES (%s, %s)"
+
+# Define spool_activity()
+def spool_activity(rows: list, path: Path = ACTIVITY_SPOOL):
+    """Append activity rows to a local spool file (default: the replay spool)"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    except OSError:
+        pass # Nowhere left to keep them -- activity logging is best effort
+
+# Define insert_activity_rows()
+def insert_activity_rows(pool: ConnectionPool, rows: list) -> list:
+    """
+    Insert rows one transaction each, so a bad row fails alone: rejected rows go to ACTIVITY_REJECTED.
+    Returns the rows not yet written if the connection drops part-way (raises if none can be checked out).
+    """
+    with pool_connection(pool) as conn:
+        for i, row in enumerate(rows):
+            try:
+                with conn.transaction():
+                    conn.execute(ACTIVITY_INSERT, row)
+            except psycopg.OperationalError:
+                return rows[i:]
+            except psycopg.Error: # DataError / IntegrityError / ...: retrying can't help
+                spool_activity([row], ACTIVITY_REJECTED)
+    return []
+
+# Define flush_activity()
+def flush_activity(logger: dict, batch: list):
+    """
+    Write spooled rows plus batch in one executemany. If the database is unreachable, spool the batch for
+    the next flush; if Postgres rejects a row, write the rows one by one and set the bad ones aside.
+    """
+    with logger["spool_lock"]:
+        try:
+            spooled = [tuple(json.loads(line)) for line in ACTIVITY_SPOOL.read_text(encoding="utf-8").splitlines() if line]
+        except (OSError, ValueError):
+            spooled = []
+
+        if logger["pool"] is None: # No database configured or reachable at startup
+            spool_activity(batch)
+            return
+
+        try:
+            with pool_connection(logger["pool"]) as conn: # Commits on exit
+                with conn.cursor() as cur:
+                    cur.executemany(ACTIVITY_INSERT, spooled + batch)
+            unwritten = []
+
+        except psycopg.OperationalError: # Connection errors, incl. PoolTimeout
+            spool_activity(batch)
+            return
+
+        except psycopg.Error:
+            try:
+                unwritten = insert_activity_rows(logger["pool"], spooled + batch)
+            except psycopg.OperationalError:
+                spool_activity(batch)
+                return
+
+        ACTIVITY_SPOOL.unlink(missing_ok=True)
+        if unwritten:
+            spool_activity(unwritten)
+
+# Define run_activity_logger()
+def run_activity_logger(logger: dict):
+    """Background writer: block for the first row, gather a batch for up to ACTIVITY_FLUSH_INTERVAL, flush"""
+    activity_queue = logger["queue"]
+    while True:
+        batch = [activity_queue.get()]
+        deadline = time.monotonic() + ACTIVITY_FLUSH_INTERVAL
+        while len(batch) < ACTIVITY_BATCH_SIZE and (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(activity_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            flush_activity(logger, batch)
+        except Exception: # A bug here mustn't stop the writer for the rest of the process
+            traceback.print_exc()
+            with logger["spool_lock"]:
+                spool_activity(batch, ACTIVITY_REJECTED) # Set aside, not replayed: the batch may be part-written
+
+# Define spool_pending_activity()
+def spool_pending_activity(logger: dict):
+    """On interpreter exit, keep rows still in the queue so they're written by the next process"""
+    pending = []
+    while True:
+        try:
+            pending.append(logger["queue"].get_nowait())
+        except queue.Empty:
+            break
+    if pending:
+        with logger["spool_lock"]:
+            spool_activity(pending)
+
+# Define get_activity_logger()
+@st.cache_resource
+def get_activity_logger() -> dict:
+    """Start the process-wide background activity writer"""
+    logger = {
+        "queue": queue.Queue(maxsize=ACTIVITY_QUEUE_SIZE),
+        "spool_lock": threading.Lock(),
+        "pool": get_db_connection(),
+    }
+    threading.Thread(target=run_activity_logger, args=(logger,), daemon=True).start()
+    atexit.register(spool_pending_activity, logger)
+    return logger
+
 def log_user(
     email_address: str, 
-    activity_type: str, 
-    _connection: ConnectionPool = db_connection
+    activity_type: str
 ):
     """
     Log user activity in the user_activity table.
     Possible values in user_activity_enum:
         'SIGN UP' / 'LOGIN' / 'UPDATE PROFILE' / 'REMOVE PROFILE' / 'ANNOUNCEMENT' / 'ADMIN-AUTHORIZE' / 'ADMIN-REMOVE PROFILE' / 'POST-TRIAL SURVEY' / 'RESET PASSWORD' / 'UPDATE PHOTO' / 'UPDATE NAME' / 'UPDATE JOB' / 'UPDATE OFFICE' / 'UPDATE DEMOGRAPHIC' / 'UPDATE INTERN'
     Logs user login (to track who is using the directory).
+    Rows are queued and written in batches by a background thread, so logging adds no database round trip to the rerun.
     See technical notes: https://www.psycopg.org/psycopg3/docs/basic/params.html
     """
 
-    try:
-        # Always grab a fresh connection from the pool
-        with _connection.connection() as conn:
-            if conn.closed:
-                # Replace with a fresh connection if the previous one was bad or stale
-                conn = _connection.connection()
-
-            with conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO user_activity (work_email, activity) VALUES (%s, %s)",
-                    (email_address, activity_type),
-                )
-                conn.commit()
+    logger = get_activity_logger()
 
-    except psycopg.OperationalError as e:
-        # This catches stale/SSL-closed connections and reattempts once
-        try:
-            # st.warning("Reconnecting to database...")
-            with _connection.connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "INSERT INTO user_activity (work_email, activity) VALUES (%s, %s)",
-                        (email_address, activity_type),
-                    )
-                    conn.commit()
-        except Exception as e2:
-            error_msg1 = st.error(f"Database reconnect failed: {e2}")
-            time.sleep(2)
-            error_msg1.empty()
-
-    except Exception as e:
-        error_msg2 = st.error(f"Error logging activity: {e}")
-        time.sleep(2)
-        error_msg2.empty()
+    try:
+        logger["queue"].put_nowait((email_address, activity_type))
+    except queue.Full:
+        # Writer is falling behind (e.g. database down) -- keep the row on disk instead
+        with logger["spool_lock"]:
+            spool_activity([(email_address, activity_type)])
 
 
 # Define refresh_app() function
 def refresh_app():
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    """Re-check the change token; tables are only re-queried if the data actually changed (the pool is kept)"""
+    get_change_token.clear()
     st.rerun()
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+File: directory_facets.py
+Function: Bitset facet index for the directory sidebar filters (no Streamlit / database dependencies)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# --- Facet index ---
+
+# Sidebar filter -> directory column (list-valued columns like 'Assigned Unit' match if any element does)
+FACET_COLUMNS = {
+    "position": "Position",
+    "unit": "Assigned Unit",
+    "location": "Office Location",
+    "month": "DOB Month",
+}
+
+# Filter combinations remembered per index (sessions mostly revisit the same few)
+FACET_MEMO_SIZE = 256
+
+# Set bits in each possible byte, for counting packed bitsets
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+# Define facet_key()
+def facet_key(value) -> str:
+    """Selectbox option string of a column value (DOB Month 3 -> "3"); "" for missing values"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+class FacetIndex:
+    """
+    One packed bitset (np.packbits, one bit per row) per value of each facet column of a directory frame.
+
+    Filters are {facet: option} dicts using the selectbox option strings ("All" = no filter); a filter
+    combination is the AND of one bitset per active facet. Positions index the frame the index was
+    built from -- use them with frame.iloc[...] on that same frame only.
+    """
+
+    def __init__(self, df: pd.DataFrame, facets: dict = FACET_COLUMNS):
+        self.size = len(df)
+        self.all = np.packbits(np.ones(self.size, dtype=bool))
+        self.none = np.zeros_like(self.all)
+        self.bitsets = {}
+        self.memo = {}
+
+        for facet, col in facets.items():
+            if col not in df.columns:
+                continue
+            rows = {}
+            for row, value in enumerate(df[col].tolist()):
+                values = value if isinstance(value, (list, tuple, np.ndarray)) else [value]
+                for key in {facet_key(v) for v in values}:
+                    rows.setdefault(key, []).append(row)
+            self.bitsets[facet] = {}
+            for key, positions in rows.items():
+                bits = np.zeros(self.size, dtype=bool)
+                bits[positions] = True
+                self.bitsets[facet][key] = np.packbits(bits)
+
+    # Define bitset()
+    def bitset(self, facet: str, option: str) -> np.ndarray:
+        """Rows matching one filter option ("All", or a facet this frame doesn't have, matches every row)"""
+        if option == "All" or facet not in self.bitsets:
+            return self.all
+        return self.bitsets[facet].get(str(option), self.none)
+
+    # Define match()
+    def match(self, filters: dict) -> np.ndarray:
+        """Packed bitset of the rows matching every filter"""
+        bits = self.all
+        for facet, option in filters.items():
+            if option != "All":
+                bits = bits & self.bitset(facet, option)
+        return bits
+
+    # Define positions()
+    def positions(self, filters: dict) -> np.ndarray:
+        """Sorted row positions matching every filter (memoized per filter combination)"""
+        key = tuple(sorted(filters.items()))
+        positions = self.memo.get(key) # One lookup: another session may clear the memo between two
+        if positions is None:
+            positions = np.flatnonzero(np.unpackbits(self.match(filters), count=self.size))
+            if len(self.memo) >= FACET_MEMO_SIZE:
+                self.memo.clear()
+            self.memo[key] = positions
+        return positions
+
+    # Define count()
+    def count(self, bits: np.ndarray) -> int:
+        """Number of rows in a packed bitset"""
+        return int(POPCOUNT[bits].sum())
+
+    # Define counts()
+    def counts(self, filters: dict, facet: str) -> dict:
+        """Rows per option of one facet given the other filters ("All" = every option), for sidebar labels"""
+        bits = self.match({other: option for other, option in filters.items() if other != facet})
+        counts = {"All": self.count(bits)}
+        for option, option_bits in self.bitsets.get(facet, {}).items():
+            counts[option] = self.count(bits & option_bits)
+        return counts
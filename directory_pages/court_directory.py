@@ -6,26 +6,23 @@ Date: April 30, 2025
 """
 
 import streamlit as st
-from pathlib import Path 
-import pandas as pd
 
-from connect_data import STAFF_VIEW
-from photo import load_photo
+from connect_data import get_directory_view, filter_positions
+from connect_data import make_selection, selected_frame
+from connect_data import query_pushdown_enabled, query_directory
+from connect_data import SEARCH_DEBOUNCE_MS
+from directory_render import paginate, page_controls, reset_page
+from directory_render import display_records, get_display_records, render_card_grid, headshot_source
+from directory_render import contact_records, get_contact_table, contact_table_height
+from asset_registry import logo
+from streamlit_extras.st_keyup import st_keyup
 
 
 # --- Configure Streamlit page settings --- 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
 
 # # --- JCPAO Streamlit page logo --- 
 # st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
 
-# --- Load data --- 
-
-apa_data = STAFF_VIEW.copy()
-apa_data = apa_data.loc[apa_data["Position"].isin(['Exec', 'CTA', 'TTL', 'APA'])]
-apa_data.sort_values(by=["Last Name", "First Name"], ascending=[True, True], inplace=True, ignore_index=True)
-
-
 # --- Initialize session state --- 
 
 if "courtview_selected_position" not in st.session_state:
@@ -43,28 +40,79 @@ if "courtview_searched_text" not in st.session_state:
 if "courtview_view" not in st.session_state:
     st.session_state["courtview_view"] = "Main Directory"
 
+if "courtview_html_cards" not in st.session_state: # Render each page as one HTML grid instead of per-card elements
+    st.session_state["courtview_html_cards"] = False
 
-# --- Define callback functions --- 
+if "courtview_live_search" not in st.session_state:
+    st.session_state["courtview_live_search"] = True
 
-# Define update_df() function
-def update_df():
+if "courtview_search_generation" not in st.session_state: # Bumped to give the live search box a fresh, empty widget
+    st.session_state["courtview_search_generation"] = 0
 
-    filtered_df = apa_data.copy()
+if "courtview_search_memo" not in st.session_state: # Last name search, narrowed as the query grows
+    st.session_state["courtview_search_memo"] = {}
 
-    if st.session_state["courtview_selected_position"] != 'All':
-        filtered_df = filtered_df[filtered_df['Position']==st.session_state["courtview_selected_position"]].reset_index(drop=True)
-    if st.session_state["courtview_selected_unit"] != 'All':
-        filtered_df = filtered_df[filtered_df['Assigned Unit'].apply(lambda x: st.session_state["courtview_selected_unit"] in x)].reset_index(drop=True)
-    if st.session_state["courtview_selected_location"] != 'All': 
-        filtered_df = filtered_df[filtered_df['Office Location']==st.session_state["courtview_selected_location"]].reset_index(drop=True)
-    if st.session_state["courtview_searched_text"]: # Added searched_text to main clickback action 
-        searched_text = st.session_state["courtview_searched_text"].strip().lower()
-        search_cols = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
-        filtered_df = filtered_df[
-            filtered_df[search_cols].apply(lambda row: any(searched_text in str(value).lower() for value in row), axis=1)
-        ].reset_index(drop=True)
 
-    st.session_state["courtview_filtered_df"] = filtered_df.reset_index(drop=True)
+# --- Define callback functions --- 
+
+# Define update_df() function
+def update_df(view=None):
+
+    reset_page("courtview") # New results start on their first page
+
+    # Query pushdown mode: let Postgres filter (cached per filter combination)
+    if query_pushdown_enabled():
+        st.session_state["courtview_selection"] = {"frame": query_directory( # Shared cached frame -- a reference, not a copy
+            "court",
+            position=st.session_state["courtview_selected_position"],
+            unit=st.session_state["courtview_selected_unit"],
+            location=st.session_state["courtview_selected_location"],
+            searched_text=st.session_state["courtview_searched_text"],
+        )}
+        return
+
+    # Keep only row positions into the shared projection (see filtered_df())
+    view = view or get_directory_view("court") # Exec / CTA / TTL / APA rows, court-facing columns only (shared -- don't mutate)
+    st.session_state["courtview_selection"] = make_selection(view, filter_positions(
+        view,
+        {
+            "position": st.session_state["courtview_selected_position"],
+            "unit": st.session_state["courtview_selected_unit"],
+            "location": st.session_state["courtview_selected_location"],
+        },
+        searched_text=st.session_state["courtview_searched_text"],
+        search_memo=st.session_state["courtview_search_memo"],
+    ))
+
+# Define live_search() function
+def live_search(keyup_key):
+    """Live search box changed (debounced): search with its current text"""
+    st.session_state["courtview_searched_text"] = st.session_state[keyup_key]
+    update_df()
+
+# Define clear_search() function
+def clear_search():
+    """Empty the search box (a new live search widget, since its text lives in the browser) and re-filter"""
+    st.session_state["courtview_searched_text"] = ""
+    st.session_state["courtview_search_generation"] += 1
+    update_df()
+
+# Define filtered_df() function
+def filtered_df():
+    """This session's filtered attorneys (display records), materialized from the shared projection at render time"""
+    selection = st.session_state.get("courtview_selection")
+    if query_pushdown_enabled():
+        if not selection or "frame" not in selection:
+            update_df()
+        return st.session_state["courtview_selection"]["frame"]
+
+    view = get_directory_view("court")
+    records = get_display_records(view, "court") # Card fields, formatted once per projection version
+    df = selected_frame(view, selection, records)
+    if df is None: # First visit, or the data changed since the last filter -- re-apply the filters
+        update_df(view)
+        df = selected_frame(view, st.session_state["courtview_selection"], records)
+    return df
 
 # Reset filters button
 def reset_filters():
@@ -72,9 +120,8 @@ def reset_filters():
     st.session_state["courtview_selected_unit"] = "All"
     st.session_state["courtview_selected_location"] = "All"
     st.session_state["courtview_searched_text"] = ""
-    # filtered_df = apa_data.copy()
-    # st.session_state["courtview_filtered_df"] = filtered_df
-    st.session_state["courtview_filtered_df"] = apa_data
+    st.session_state["courtview_search_generation"] += 1
+    update_df()
 
 # --- Sidebar Filter functions --- 
 
@@ -194,65 +241,8 @@ with st.sidebar:
 
 # --- Internal Directory HELPER funcs --- 
 
-def configure_badge(row):
-
-    # Only possible st.badge colors: blue, green, orange, red, violet, gray/grey, or primary
-    
-    # 'Assigned Unit' - 'Exec' / 'GCU' / 'SVU' / 'VCU' / 'CSU' / 'COMBAT' / 'Drug' / 'FSD'
-    if row['Assigned Unit']:
-        unit = ' / '.join(row['Assigned Unit'])
-    else:
-        unit = ':red[???]' # N/A 
-    
-    # Drug Court 
-    if 'Drug' in unit:
-        unit = unit.replace("Drug", "Drug Court")
-    
-    # 'Position' - 'Exec' / 'CTA' / 'TTL' / 'APA'
-    if row['Position'] == 'Exec':
-        if row['Position'] == unit:
-            position_badge = f":red-badge[**Executive Staff**]"
-        else:
-            position_badge = f":red-badge[**Executive Staff - {unit}**]"
-    elif row['Position'] == 'CTA':
-        position_badge = f":orange-badge[**Chief Trial Attorney - {unit}**]"
-    elif row['Position'] == 'TTL':
-        position_badge = f":green-badge[**Trial Team Leader - {unit}**]"
-    elif row['Position'] == 'APA':
-        position_badge = f":blue-badge[**Assistant Prosecuting Attorney - {unit}**]"
-    
-    return position_badge
-
-def reformat_location(row):
-
-    # 'Office Location' - 'Dt-11' / 'Dt-10' / 'Dt-9' / 'Dt-7M' / 'Indy' / 'FSD'
-    if row['Office Location'] == 'Dt-11':
-        office_location = "Downtown Courthouse, 11th floor"
-    elif row['Office Location'] == 'Dt-10':
-        office_location = "Downtown Courthouse, 10th floor"
-    elif row['Office Location'] == 'Dt-9':
-        office_location = "Downtown Courthouse, 9th floor (COMBAT)"
-    elif row['Office Location'] == 'Dt-7M':
-        office_location = "Downtown Courthouse, 7M"
-    elif row['Office Location'] == 'Indy':
-        office_location = "Eastern Jackson Courthouse, Independence"
-    elif row['Office Location'] == 'FSD':
-        office_location = "Family Support Division"
-
-    return office_location
-
-def reformat_phone_num(phone_num):
-    # Handle NaN values or non-string types 
-    if not isinstance(phone_num, str) or pd.isna(phone_num):
-        return phone_num
-    
-    # Check length is 10-digits, then reformat 
-    if len(phone_num) == 10:
-        return f"{phone_num[:3]}-{phone_num[3:6]}-{phone_num[6:]}"
-    else:
-        return phone_num
-
 def display_attorney(row):
+    """One card from a display record (see directory_render.court_records())"""
 
     with st.container():
 
@@ -261,12 +251,7 @@ def display_attorney(row):
         with col1:
             
             # Headshot Photo (if None, JCPAO logo)
-            if row['PhotoID'] is None: 
-                st.image(jcpao_logo, width=400)
-            else:
-                headshot_path = "JCPAO_headshots/"+row['PhotoID']
-                attorney_headshot = load_photo(headshot_path)
-                st.image(attorney_headshot, width=400)
+            st.image(headshot_source(row) or logo("card"), width=400)
 
         with col2:
 
@@ -274,25 +259,19 @@ def display_attorney(row):
             st.header(f"{row['Full Name']}")
 
             # Job Title
-            st.subheader(f"{row['Job Title']}")
+            st.subheader(row['Job Title'])
 
             # Position
-            position_badge = configure_badge(row)
-            st.markdown(position_badge)
+            st.markdown(row['Position Badge'])
             
             # Office Location
-            office_location = reformat_location(row)
-            st.write(f"**Office Location:** {office_location}")
+            st.write(f"**Office Location:** {row['Office Location']}")
 
             # Work Email Address
             st.write(f"**Email Address:** {row['Work Email Address']}")
 
             # Work Phone Number 
-            work_phone = reformat_phone_num(row['Work Phone #'])
-            if str(row['Work Phone #']).startswith("816881"):
-                st.write(f"**Work Phone:** {work_phone} (ext. {str(row['Work Phone #'])[-4:]})")
-            else:
-                st.write(f"**Work Phone:** {work_phone}")
+            st.write(f"**Work Phone:** {row['Work Phone']}")
             
         st.divider()
 
@@ -303,48 +282,79 @@ st.divider()
 
 def main_directory():
 
-    df = st.session_state.get("courtview_filtered_df", apa_data)
-
     # Text search
-    searched_text = st.text_input(
-        "Search attorney name:",
-        key="courtview_searched_text",
-        # on_change=update_df,
+    if st.session_state["courtview_live_search"]:
+        # Filters as the user types, once typing pauses (calls live_search() inline, before df is read below)
+        st_keyup(
+            "Search attorney name:",
+            key=f"courtview_keyup_{st.session_state['courtview_search_generation']}",
+            debounce=SEARCH_DEBOUNCE_MS,
+            on_change=live_search,
+            args=(f"courtview_keyup_{st.session_state['courtview_search_generation']}",),
+            placeholder="Start typing a name",
+        )
+    else:
+        searched_text = st.text_input(
+            "Search attorney name:",
+            key="courtview_searched_text",
+            # on_change=update_df,
+        )
+
+        text_search = st.button(
+            "Search",
+            icon="🔎",
+            on_click=update_df,
+            key="courtview_text_search",
+        )
+
+    live_search_mode = st.toggle(
+        "Search as you type",
+        key="courtview_live_search",
+        on_change=clear_search,
     )
 
-    text_search = st.button(
-        "Search",
-        icon="🔎",
-        on_click=update_df,
-        key="courtview_text_search",
+    html_cards = st.toggle(
+        "Compact card grid",
+        key="courtview_html_cards",
     )
 
     st.divider()
 
+    df = filtered_df()
+
     if df.empty:
         st.info("No attorneys found matching the search criteria.", icon="⚠️")
     else:
-        for i, row in df.iterrows():
-            display_attorney(row)
+        page_df = paginate(df, "courtview")
+        if query_pushdown_enabled(): # Pushdown results aren't projection views -- format just this page
+            page_df = display_records(page_df, "court")
+        if html_cards:
+            render_card_grid(page_df)
+        else:
+            for i, row in page_df.iterrows():
+                display_attorney(row)
+        page_controls(len(df), "courtview")
 
 
 def contact_directory():
 
-    # NO Text Search -- ignore 'searched_text' 
-    st.session_state["searched_text"] = ""
-
-    df = st.session_state.get("courtview_filtered_df", apa_data)
-
-    # Reformat df
-    df = df.sort_values(by=['Last Name'])
-    attorney_contacts = df[['Full Name','Work Email Address', 'Work Phone #']].copy()
-    attorney_contacts['Work Phone #'] = attorney_contacts['Work Phone #'].apply(reformat_phone_num)
-    attorney_contacts.rename(columns={
-        'Full Name': 'Attorney Name',
-        'Work Email Address': 'Email Address',
-        'Work Phone #': 'Phone Number'
-    })
-    st.dataframe(attorney_contacts, hide_index=True, height=int(35.2 * (len(df) + 1)))
+    # NO Text Search -- sidebar filters only
+    filters = {
+        "position": st.session_state["courtview_selected_position"],
+        "unit": st.session_state["courtview_selected_unit"],
+        "location": st.session_state["courtview_selected_location"],
+    }
+
+    if query_pushdown_enabled():
+        attorney_contacts = contact_records(query_directory("court", **filters))
+    else:
+        attorney_contacts = get_contact_table(get_directory_view("court"), filters) # Cached per filter state (shared -- don't mutate)
+
+    if attorney_contacts.empty:
+        st.info("No attorneys found matching the search criteria.", icon="⚠️")
+        return
+
+    st.dataframe(attorney_contacts, hide_index=True, height=contact_table_height(len(attorney_contacts)))
 
 # --- Display directories --- 
 if st.session_state['courtview_view'] == 'Main Directory':
@@ -1,5 +1,6 @@
 import streamlit as st
-from pathlib import Path
+
+from asset_registry import asset_text
 
 
 # --- Sidebar Filter functions --- 
@@ -33,45 +34,45 @@ st.divider()
 st.subheader("Data Sharing Policy", divider="blue") # Internal Staff Directory 
 
 with st.expander("Will my personal information be shared publicly?"):
-    data_sharing = Path("assets/text/help/data_sharing.txt")
-    st.markdown(data_sharing.read_text(encoding="utf-8"))
+    data_sharing = "text/help/data_sharing.txt"
+    st.markdown(asset_text(data_sharing))
 
 with st.expander("What user information is collected for the directory?"):
-    user_data = Path("assets/text/help/user_data.txt")
-    st.markdown(user_data.read_text(encoding="utf-8"), unsafe_allow_html=True)
+    user_data = "text/help/user_data.txt"
+    st.markdown(asset_text(user_data), unsafe_allow_html=True)
 
 with st.expander("How do I find my **Job Title** in Workday?"):
-    job_title = Path("assets/text/help/find_job_title.txt")
-    st.markdown(job_title.read_text(encoding="utf-8"))
+    job_title = "text/help/find_job_title.txt"
+    st.markdown(asset_text(job_title))
 
 with st.expander("How do I find my **Hire Date** in Workday?"):
-    hire_date = Path("assets/text/help/find_hire_date.txt")
-    st.markdown(hire_date.read_text(encoding="utf-8"))
+    hire_date = "text/help/find_hire_date.txt"
+    st.markdown(asset_text(hire_date))
 
 with st.expander("How do I update my information in the directory?"):
-    user_management = Path("assets/text/help/user_management.txt")
-    st.markdown(user_management.read_text(encoding="utf-8"))
+    user_management = "text/help/user_management.txt"
+    st.markdown(asset_text(user_management))
 
 with st.expander("What happens if I depart from the Office?"):
-    delete_user = Path("assets/text/help/delete_user.txt")
-    st.markdown(delete_user.read_text(encoding="utf-8"))
+    delete_user = "text/help/delete_user.txt"
+    st.markdown(asset_text(delete_user))
 
 st.subheader("Headshot Photos", divider="blue")
 
 with st.expander("Am I allowed to use my headshot photo for personal use?"):
-    photo_use = Path("assets/text/help/photo_use.txt")
-    st.markdown(photo_use.read_text(encoding="utf-8"))
+    photo_use = "text/help/photo_use.txt"
+    st.markdown(asset_text(photo_use))
 
 with st.expander("How do I upload my headshot photo to my Microsoft org account?"):
-    microsoft_photo = Path("assets/text/help/photo_microsoft.txt")
-    st.markdown(microsoft_photo.read_text(encoding="utf-8"))
+    microsoft_photo = "text/help/photo_microsoft.txt"
+    st.markdown(asset_text(microsoft_photo))
 
 with st.expander("I don't see my headshot photo in the directory!"):
-    missing_photo = Path("assets/text/help/photo_missing.txt")
-    st.markdown(missing_photo.read_text(encoding="utf-8"))
+    missing_photo = "text/help/photo_missing.txt"
+    st.markdown(asset_text(missing_photo))
 
 st.subheader("About the Directory", divider="blue")
 
 with st.expander("Technical Notes"):
-    about = Path("assets/text/help/about.txt")
-    st.markdown(about.read_text(encoding="utf-8"))
+    about = "text/help/about.txt"
+    st.markdown(asset_text(about))
@@ -6,10 +6,11 @@ Date: June 9, 2025
 """
 
 import streamlit as st
-from pathlib import Path
+
+from asset_registry import page_logo
 
 # --- Configure Streamlit page settings --- 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
+jcpao_logo = page_logo()
 
 # --- JCPAO Streamlit page logo --- 
 st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
@@ -7,22 +7,22 @@ Date: June 6, 2025
 
 import streamlit as st
 from datetime import datetime
-from pathlib import Path
-import pandas as pd
 
-from connect_data import display_personal_name, ordinal, parse_month #, init_bdays
-from connect_data import STAFF_DIRECTORY # , get_interns
-from photo import load_photo
+from connect_data import parse_month #, init_bdays
+from connect_data import get_projection_view, get_facet_index # , get_interns
+from connect_data import make_selection, selected_frame
+from directory_render import paginate, page_controls, reset_page
+from directory_render import get_display_records, headshot_source
+from asset_registry import logo
 
 # --- Configure Streamlit page settings --- 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
 
 # # --- JCPAO Streamlit page logo --- 
 # st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
 
 
 # --- Load data --- 
-emp_view = STAFF_DIRECTORY # "emp_view"
+emp_view = get_projection_view("birthdays") # "emp_view" -- names, DOB and PhotoID only, sorted by DOB Month / DOB Day / Last Name
 today = datetime.today()
 today_date = today.strftime("%A, %B %d, %Y")
 
@@ -32,20 +32,27 @@ today_date = today.strftime("%A, %B %d, %Y")
 # if "selected_staff_bdays_month" not in st.session_state:
 #     st.session_state["selected_staff_bdays_month"] = parse_month("index", str(today.month)) # None
 
-if "filtered_staff_bdays_df" not in st.session_state:
-    current_month = today.month
-    filtered_df = emp_view[emp_view['DOB Month']==current_month].sort_values(by=["DOB Month", "DOB Day", "Last Name"], ascending=[True, True, True]).reset_index(drop=True).copy()
-    st.session_state["filtered_staff_bdays_df"] = filtered_df
-
 # --- Callback functions ---
 
 # Define update_df() function
 def update_df():
 
-    current_month = int(st.session_state["selected_staff_bdays_month"])
-    filtered_df = emp_view.copy()
-    filtered_df = filtered_df[filtered_df['DOB Month']==current_month].sort_values(by=["DOB Month", "DOB Day", "Last Name"], ascending=[True, True, True]).reset_index(drop=True).copy()
-    st.session_state["filtered_staff_bdays_df"] = filtered_df
+    reset_page("staff_bdays") # New results start on their first page
+
+    # Month facet rows keep the projection's birthday order; store only their positions (see filtered_df())
+    selected_month = st.session_state.get("selected_staff_bdays_month", str(today.month))
+    positions = get_facet_index(emp_view).positions({"month": selected_month})
+    st.session_state["staff_bdays_selection"] = make_selection(emp_view, positions)
+
+# Define filtered_df() function
+def filtered_df():
+    """This session's birthdays, materialized from the shared projection at render time"""
+    records = get_display_records(emp_view, "birthdays") # Card fields, formatted once per projection version
+    df = selected_frame(emp_view, st.session_state.get("staff_bdays_selection"), records)
+    if df is None: # First visit, or the data changed since the last filter
+        update_df()
+        df = selected_frame(emp_view, st.session_state["staff_bdays_selection"], records)
+    return df
 
 # --- Sidebar Filter functions --- 
 
@@ -87,30 +94,17 @@ with st.sidebar:
 # --- display_employee() function --- 
 
 def display_employee(row):
+    """One card from a display record (see directory_render.birthday_records())"""
 
     col1, col2, col3 = st.columns([1.5, 1, 1.5], gap="large",vertical_alignment="center")
 
     with col2:
         # Headshot Photo (if None, JCPAO logo)
-        if row['PhotoID'] is None:
-            st.image(
-                jcpao_logo, 
-                caption=(
-                    f"{display_personal_name(row)}\n"
-                    f":violet-badge[🎉**{row['DOB'].strftime('%b')} {ordinal(row['DOB'].day)}**]"
-                ),
-                width=250)
-        else:
-            headshot_path = "JCPAO_headshots/"+row['PhotoID']
-            attorney_headshot = load_photo(headshot_path)
-            st.image(
-                attorney_headshot, 
-                caption=(
-                    f"{display_personal_name(row)}\n"
-                    f":violet-badge[🎉**{row['DOB'].strftime('%b')} {ordinal(row['DOB'].day)}**]"
-                ), # f":violet-badge[🎉 **{dob_month}/{dob_day}**]"
-                width=250
-            )
+        st.image(
+            headshot_source(row, "birthday") or logo("birthday"), 
+            caption=row['Caption'], # "Name\n:violet-badge[🎉**Mar 3rd**]"
+            width=250
+        )
 
     # with col3:
 
@@ -132,7 +126,7 @@ st.divider()
 
 # --- Display birthdays --- 
 
-df = st.session_state["filtered_staff_bdays_df"].copy()
+df = filtered_df()
 
 if df.empty:
     st.info("No upcoming birthdays this month. Make sure that a birthday month is selected in the sidebar!", icon="🥳")
@@ -140,8 +134,9 @@ if df.empty:
 
 else:
     st.balloons()
-    for i, row in df.iterrows():
+    for i, row in paginate(df, "staff_bdays").iterrows():
         display_employee(row)
+    page_controls(len(df), "staff_bdays")
 
 
 
@@ -7,18 +7,20 @@ Updated: November 10, 2025
 """
 
 import streamlit as st
-from pathlib import Path 
-import pandas as pd
 
-from connect_data import STAFF_DIRECTORY # Load data
-from photo import load_photo
+from connect_data import get_directory_view, filter_positions, get_facet_index # Load data
+from connect_data import make_selection, selected_frame
+from connect_data import query_pushdown_enabled, query_directory
+from connect_data import SEARCH_DEBOUNCE_MS
+from directory_render import paginate, page_controls, reset_page
+from directory_render import display_records, get_display_records, render_card_grid, headshot_source
+from asset_registry import logo
+from streamlit_extras.st_keyup import st_keyup
 
 # st.title("Staff Directory")
-# TODO - directory pagination? 
 
 # # --- Configure Streamlit page settings --- 
-# jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
-
+# 
 # # --- JCPAO Streamlit page logo --- 
 # st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
 
@@ -40,30 +42,85 @@ if "staffview_selected_month" not in st.session_state:
 if "staffview_searched_text" not in st.session_state:
     st.session_state["staffview_searched_text"] = ""
 
+if "staffview_fuzzy_search" not in st.session_state:
+    st.session_state["staffview_fuzzy_search"] = False
+
+if "staffview_html_cards" not in st.session_state: # Render each page as one HTML grid instead of per-card elements
+    st.session_state["staffview_html_cards"] = False
+
+if "staffview_live_search" not in st.session_state:
+    st.session_state["staffview_live_search"] = True
+
+if "staffview_search_generation" not in st.session_state: # Bumped to give the live search box a fresh, empty widget
+    st.session_state["staffview_search_generation"] = 0
+
+if "staffview_search_memo" not in st.session_state: # Last name search, narrowed as the query grows
+    st.session_state["staffview_search_memo"] = {}
+
 
 # --- Define callback functions --- 
 
 # Define update_df() function
-def update_df():
-
-    filtered_df = STAFF_DIRECTORY.copy()
-
-    if st.session_state["staffview_selected_position"] != 'All':
-        filtered_df = filtered_df[filtered_df['Position']==st.session_state["staffview_selected_position"]].reset_index(drop=True)
-    if st.session_state["staffview_selected_unit"] != 'All':
-        filtered_df = filtered_df[filtered_df['Assigned Unit'].apply(lambda x: st.session_state["staffview_selected_unit"] in x)].reset_index(drop=True)
-    if st.session_state["staffview_selected_location"] != 'All': 
-        filtered_df = filtered_df[filtered_df['Office Location']==st.session_state["staffview_selected_location"]].reset_index(drop=True)
-    if st.session_state["staffview_selected_month"] != 'All':
-        filtered_df = filtered_df[filtered_df['DOB Month']==int(st.session_state["staffview_selected_month"])].reset_index(drop=True)
-    if st.session_state["staffview_searched_text"]: # Added searched_text to main clickback action 
-        searched_text = st.session_state["staffview_searched_text"].strip().lower()
-        search_cols = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
-        filtered_df = filtered_df[
-            filtered_df[search_cols].apply(lambda row: any(searched_text in str(value).lower() for value in row), axis=1)
-        ].reset_index(drop=True)
-
-    st.session_state["staffview_filtered_df"] = filtered_df.reset_index(drop=True)
+def update_df(view=None):
+
+    reset_page("staffview") # New results start on their first page
+
+    # Query pushdown mode: let Postgres filter (cached per filter combination)
+    if query_pushdown_enabled():
+        st.session_state["staffview_selection"] = {"frame": query_directory( # Shared cached frame -- a reference, not a copy
+            "staff",
+            position=st.session_state["staffview_selected_position"],
+            unit=st.session_state["staffview_selected_unit"],
+            location=st.session_state["staffview_selected_location"],
+            month=st.session_state["staffview_selected_month"],
+            searched_text=st.session_state["staffview_searched_text"],
+        )}
+        return
+
+    # Keep only row positions into the shared snapshot (see filtered_df())
+    view = view or get_directory_view("staff")
+    st.session_state["staffview_selection"] = make_selection(view, filter_positions(
+        view,
+        {
+            "position": st.session_state["staffview_selected_position"],
+            "unit": st.session_state["staffview_selected_unit"],
+            "location": st.session_state["staffview_selected_location"],
+            "month": st.session_state["staffview_selected_month"],
+        },
+        searched_text=st.session_state["staffview_searched_text"],
+        fuzzy=st.session_state["staffview_fuzzy_search"], # Typo-tolerant, best matches first
+        search_memo=st.session_state["staffview_search_memo"],
+    ))
+
+# Define live_search() function
+def live_search(keyup_key):
+    """Live search box changed (debounced): search with its current text"""
+    st.session_state["staffview_searched_text"] = st.session_state[keyup_key]
+    update_df()
+
+# Define clear_search() function
+def clear_search():
+    """Empty the search box (a new live search widget, since its text lives in the browser) and re-filter"""
+    st.session_state["staffview_searched_text"] = ""
+    st.session_state["staffview_search_generation"] += 1
+    update_df()
+
+# Define filtered_df() function
+def filtered_df():
+    """This session's filtered directory (display records), materialized from the shared snapshot at render time"""
+    selection = st.session_state.get("staffview_selection")
+    if query_pushdown_enabled():
+        if not selection or "frame" not in selection:
+            update_df()
+        return st.session_state["staffview_selection"]["frame"]
+
+    view = get_directory_view("staff")
+    records = get_display_records(view, "staff") # Card fields, formatted once per snapshot
+    df = selected_frame(view, selection, records)
+    if df is None: # First visit, or the snapshot changed since the last filter -- re-apply the filters
+        update_df(view)
+        df = selected_frame(view, st.session_state["staffview_selection"], records)
+    return df
 
 # Reset filters button
 def reset_filters():
@@ -72,13 +129,39 @@ def reset_filters():
     st.session_state["staffview_selected_location"] = "All"
     st.session_state["staffview_selected_month"] = "All"
     st.session_state["staffview_searched_text"] = ""
+    st.session_state["staffview_search_generation"] += 1
     # filtered_df = STAFF_DIRECTORY.copy()
     # st.session_state["staffview_filtered_df"] = filtered_df
-    st.session_state["staffview_filtered_df"] = STAFF_DIRECTORY
+    update_df()
 
 
 # --- Sidebar Filter functions ---
 
+# Live option counts given the other active filters (not in pushdown mode -- there is no in-memory index)
+sidebar_filters = {
+    "position": st.session_state["staffview_selected_position"],
+    "unit": st.session_state["staffview_selected_unit"],
+    "location": st.session_state["staffview_selected_location"],
+    "month": st.session_state["staffview_selected_month"],
+}
+# Count labels change each selectbox's identity as counts move, which would reset it to "All" --
+# re-assigning the current selections through session state keeps them
+for facet in sidebar_filters:
+    st.session_state[f"staffview_selected_{facet}"] = sidebar_filters[facet]
+
+if query_pushdown_enabled():
+    facet_counts = {}
+else:
+    facet_index = get_facet_index(get_directory_view("staff"))
+    facet_counts = {facet: facet_index.counts(sidebar_filters, facet) for facet in sidebar_filters}
+
+# Define facet_label() function
+def facet_label(facet, labels):
+    """Selectbox format_func: option label plus its live count, e.g. "SVU, Special Victims (14)" """
+    if facet not in facet_counts:
+        return lambda x: labels[x]
+    return lambda x: f"{labels[x]} ({facet_counts[facet].get(x, 0)})"
+
 with st.sidebar:
     # Select options: position / unit / location / birthday month 
     st.title("Jackson County Prosecuting Attorney's Office")
@@ -105,7 +188,7 @@ with st.sidebar:
         label= ":green-badge[**Filter by Position:**]", # "Filter by Position:",
         options=positions_dict.keys(), # ('All', 'Exec', 'CTA', 'TTL', 'APA', 'I', 'VA', 'LA', 'SS')
         index=0, # All
-        format_func=lambda x: positions_dict[x],
+        format_func=facet_label("position", positions_dict),
         key='staffview_selected_position',
         placeholder="Select job position",
         on_change=update_df,
@@ -128,7 +211,7 @@ with st.sidebar:
         label=":blue-badge[**Filter by Assigned Unit:**]", # "Filter by Assigned Unit:",
         options=units_dict.keys(), # ('Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD')
         index=0, # All
-        format_func=lambda x: units_dict[x],
+        format_func=facet_label("unit", units_dict),
         key='staffview_selected_unit',
         placeholder="Select unit",
         on_change=update_df,
@@ -148,7 +231,7 @@ with st.sidebar:
         label=":orange-badge[**Filter by Office Location:**]", # "Filter by Office Location:",
         options=locations_dict.keys(), # ('Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD')
         index=0, # All
-        format_func=lambda x: locations_dict[x],
+        format_func=facet_label("location", locations_dict),
         key='staffview_selected_location',
         placeholder="Select office location",
         on_change=update_df,
@@ -174,7 +257,7 @@ with st.sidebar:
         label=":violet-badge[**Filter by Birthday Month:**]", # "Filter by Birthday Month:",
         options=months_dict.keys(),
         index=0, # All
-        format_func=lambda x: months_dict[x],
+        format_func=facet_label("month", months_dict),
         key='staffview_selected_month',
         placeholder="Select birthday month",
         on_change=update_df,
@@ -203,18 +286,8 @@ with st.sidebar:
 
 # --- Internal Directory HELPER funcs --- 
 
-def reformat_phone_num(phone_num):
-    # Handle NaN values or non-string types 
-    if not isinstance(phone_num, str) or pd.isna(phone_num):
-        return phone_num
-    
-    # Check length is 10-digits, then reformat 
-    if len(phone_num) == 10:
-        return f"{phone_num[:3]}-{phone_num[3:6]}-{phone_num[6:]}"
-    else:
-        return phone_num
-
 def display_employee(row):
+    """One card from a display record (see directory_render.staff_records())"""
 
     with st.container():
 
@@ -223,103 +296,27 @@ def display_employee(row):
         with col1:
             
             # Headshot Photo (if None, JCPAO logo)
-            jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
-            if row['PhotoID'] is None:
-                st.image(jcpao_logo, width=400)
-            else:
-                headshot_path = "JCPAO_headshots/"+row['PhotoID'].strip()
-                staff_headshot = load_photo(headshot_path)
-                st.image(staff_headshot, width=400)
+            st.image(headshot_source(row) or logo("card"), width=400)
             
         with col2:
 
             # Employee Name
-            if row['Preferred Name']: # If preferred name exists
-                st.header(f"{row['Preferred Name'].strip()} {row['Last Name'].strip()}")
-            else:
-                st.header(f"{row['First Name'].strip()} {row['Last Name'].strip()}")
+            st.header(row['Display Name'])
 
             # Job Title
-            st.subheader(f"{row['Job Title']}")
-
-            # Position BADGE
-            positions_badge = {
-                'Exec': 'Exec Staff', 
-                'CTA': 'CTA', 
-                'TTL': 'TTL', 
-                'APA': 'APA',
-                'I': 'Investigator',
-                'VA': 'Victim Advocate',
-                'LA': 'Legal Assistant',
-                'SS': 'Support Staff',
-                'INTERN': 'Intern',
-                'PET': 'Paw-secuting Attorney 🐾'
-            }
-            # position_badge = st.badge(f"**Position:** {positions_badge.get(row['Position'], row['Position'])}", icon=None, color="green")
-
-            # Assigned Unit (unit_enum[]) BADGE
-            units_badge = {
-                'Exec': 'Exec Staff',
-                'GCU': 'GCU',
-                'SVU': 'SVU',
-                'VCU': 'VCU',
-                'CSU': 'CSU',
-                'COMBAT': 'COMBAT',
-                'Drug': 'Drug Court',
-                'FSD': 'Family Support',
-                'WARRANT': 'Warrant Desk'
-            } # units_badge.get(row['Assigned Unit'], row['Assigned Unit'])
-            # unit_badge = st.badge(f"**{' / '.join(units_badge.get(item, item) for item in row['Assigned Unit'])}**", icon=None, color="blue")
-
-            if row['Assigned Unit']:
-                unit = ' / '.join(row['Assigned Unit'])
-            else:
-                unit = ':red[???]' # N/A 
-
-            # Office Location BADGE
-            locations_badge = {
-                'Dt-11': 'Downtown, 11th',
-                'Dt-10': 'Downtown, 10th',
-                'Dt-9': 'Downtown, 9th',
-                'Dt-7M': 'Downtown, 7M',
-                'Indy': 'Eastern Jack, Indy',
-                'FSD': 'Downtown, FSD'
-            }
-            # location_badge = st.badge(f"**Office Location:** {locations_badge.get(row['Office Location'], row['Office Location'])}", icon="🏢", color="orange")
-
-            # DOB Month / DOB Day BADGE 
-            if not pd.isna(row['DOB Month']):
-                dob_month = int(row['DOB Month'])
-            else:
-                dob_month = " "
-            if not pd.isna(row['DOB Day']):
-                dob_day = int(row['DOB Day'])
-            else:
-                dob_day = " "
-            # dob_badge = st.badge(f"**Birthday:** {row['DOB Month']}/{row['DOB Day']}", icon="🎉", color="violet")
-
-            # Display BADGE thread 
-            st.markdown( # position_badge, unit_badge, location_badge, dob_badge
-                f":green-badge[**{positions_badge.get(row['Position'], row['Position'])}**]"
-                # f":blue-badge[**{' / '.join(units_badge.get(item, item) for item in row['Assigned Unit'])}**]"
-                f":blue-badge[**{unit}**]"
-                f":orange-badge[🏢 **{locations_badge.get(row['Office Location'], row['Office Location'])}**]"
-                f":violet-badge[🎉 **{dob_month}/{dob_day}**]"
-            )
+            st.subheader(row['Job Title'])
+
+            # Position / Assigned Unit / Office Location / Birthday BADGE thread
+            st.markdown(row['Badge Line'])
 
             # Work Phone Number
-            work_phone = reformat_phone_num(row['Work Phone #'])
-            if str(row['Work Phone #']).startswith("816881"):
-                st.write(f"**Work Phone:** {work_phone} (ext. {str(row['Work Phone #'])[-4:]})")
-            else:
-                st.write(f"**Work Phone:** {work_phone}")
+            st.write(f"**Work Phone:** {row['Work Phone']}")
             
             # Work Email Address
             st.write(f"**Work Email:** {row['Work Email Address']}")
 
             # Personal Phone Number
-            personal_phone = reformat_phone_num(row['Personal Phone #'])
-            st.write(f"**Personal Phone:** {personal_phone}")
+            st.write(f"**Personal Phone:** {row['Personal Phone']}")
 
             # Personal Email Address - exclude, for now 
             # st.write(f"**Personal Email:** {row['Personal Email Address']}")
@@ -331,30 +328,66 @@ def display_employee(row):
 # filtered_df = emp_view.copy()
 # filtered_df.reset_index(drop=True, inplace=True)
 
-df = st.session_state.get("staffview_filtered_df", STAFF_DIRECTORY)
-
 # Internal Directory title 
 st.markdown("<h1 style='text-align: center; color: black;'>Internal Staff Directory</h1>", unsafe_allow_html=True)
 st.divider()
 
 # Text Search feature 
-searched_text = st.text_input(
-    "Search employee name:",
-    key="staffview_searched_text"
+if st.session_state["staffview_live_search"]:
+    # Filters as the user types, once typing pauses (calls live_search() inline, before df is read below)
+    st_keyup(
+        "Search employee name:",
+        key=f"staffview_keyup_{st.session_state['staffview_search_generation']}",
+        debounce=SEARCH_DEBOUNCE_MS,
+        on_change=live_search,
+        args=(f"staffview_keyup_{st.session_state['staffview_search_generation']}",),
+        placeholder="Start typing a name",
+    )
+else:
+    searched_text = st.text_input(
+        "Search employee name:",
+        key="staffview_searched_text"
+    )
+
+    text_search = st.button(
+        "Search",
+        icon="🔎",
+        on_click=update_df,
+        key="staffview_text_search",
+    )
+
+live_search_mode = st.toggle(
+    "Search as you type",
+    key="staffview_live_search",
+    on_change=clear_search,
+)
+
+html_cards = st.toggle(
+    "Compact card grid",
+    key="staffview_html_cards",
 )
 
-text_search = st.button(
-    "Search",
-    icon="🔎",
-    on_click=update_df,
-    key="staffview_text_search",
+fuzzy_search = st.toggle(
+    "Fuzzy match (typos / similar-sounding names)",
+    key="staffview_fuzzy_search",
+    on_change=update_df,
+    disabled=query_pushdown_enabled(), # Postgres filters match exact substrings only
 )
 
 st.divider()
 
+df = filtered_df()
+
 if df.empty:
     st.info("No active JCPAO staff found given the selected category filters.", icon="⚠️")
 else:
-    for i, row in df.iterrows():
-        display_employee(row)
+    page_df = paginate(df, "staffview")
+    if query_pushdown_enabled(): # Pushdown results aren't snapshot views -- format just this page
+        page_df = display_records(page_df, "staff")
+    if html_cards:
+        render_card_grid(page_df)
+    else:
+        for i, row in page_df.iterrows():
+            display_employee(row)
+    page_controls(len(df), "staffview")
 
@@ -2,6 +2,8 @@ import streamlit as st
 from pathlib import Path
 from datetime import datetime
 
+from asset_registry import asset_text, asset_files
+
 
 # --- Sidebar Filter functions --- 
 
@@ -35,14 +37,14 @@ st.header("Home Bulletin", divider="gray")
 # Init counter
 counter = 0
 
-# Get len of .txt files
-file_count = sum(1 for p in Path("assets/text/updates").iterdir() if p.is_file())
+# Bulletin .txt files, oldest first (named YYYY_MM_DD.txt)
+updates = asset_files("text/updates")
+file_count = len(updates)
 
-for item in Path("assets/text/updates").iterdir():
+for item in updates:
     counter += 1
-    if item.is_file() and item.suffix==".txt":
-        dt_name = datetime.strptime(item.stem, "%Y_%m_%d")
-        dt_name = dt_name.strftime("%A, %B %d, %Y")
+    dt_name = datetime.strptime(Path(item).stem, "%Y_%m_%d")
+    dt_name = dt_name.strftime("%A, %B %d, %Y")
 
-        with st.expander(f"Bulletin Update #{counter}: {dt_name}", expanded=True if counter==file_count else False, width="stretch"):
-            st.markdown(item.read_text(encoding="utf-8"))
+    with st.expander(f"Bulletin Update #{counter}: {dt_name}", expanded=True if counter==file_count else False, width="stretch"):
+        st.markdown(asset_text(item))
@@ -0,0 +1,404 @@
+"""
+File: directory_render.py
+Function: Shared rendering helpers for the directory pages (pagination, display records, contact table, HTML card grid)
+"""
+
+import streamlit as st
+import pandas as pd
+import html
+
+from connect_data import derived, ordinal, get_facet_index
+from photo import headshot_url, headshot_srcset, HEADSHOT_IMAGE_DPR, HEADSHOT_FOLDER
+from photo import get_headshot_store, headshot_bytes, get_headshot_scan
+from asset_registry import asset_data_uri, JCPAO_LOGO_SMALL
+
+
+# --- Pagination ---
+# Pages render one window of their (already filtered) rows, so a rerun costs at most page-size cards
+# however many people match. The cursor lives in session state under "<key>_page" / "<key>_page_size".
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+
+# Define reset_page()
+def reset_page(key: str):
+    """Back to the first page (call whenever the filtered rows change)"""
+    st.session_state[f"{key}_page"] = 0
+
+# Define turn_page()
+def turn_page(key: str, step: int):
+    """Move the page cursor (callback for the prev / next buttons)"""
+    st.session_state[f"{key}_page"] = st.session_state.get(f"{key}_page", 0) + step
+
+# Define page_window()
+def page_window(total: int, key: str) -> tuple[int, int, int, int]:
+    """(page, page count, first row, end row) of the current page, with the cursor clamped to the rows"""
+    page_size = st.session_state.get(f"{key}_page_size", DEFAULT_PAGE_SIZE)
+    pages = max(1, -(-total // page_size))
+    page = min(max(st.session_state.get(f"{key}_page", 0), 0), pages - 1)
+    st.session_state[f"{key}_page"] = page
+    start = page * page_size
+    return page, pages, start, min(start + page_size, total)
+
+# Define paginate()
+def paginate(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Rows of df on the current page"""
+    _, _, start, stop = page_window(len(df), key)
+    return df.iloc[start:stop]
+
+# Define page_controls()
+def page_controls(total: int, key: str):
+    """Prev / next buttons, row range and page-size select for a paginated list of total rows"""
+    if total == 0:
+        return
+    page, pages, start, stop = page_window(total, key)
+
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1.2], gap="small", vertical_alignment="center")
+    with col1:
+        st.button(
+            "Previous",
+            icon=":material/chevron_left:",
+            key=f"{key}_page_prev",
+            on_click=turn_page,
+            args=(key, -1),
+            disabled=page == 0,
+        )
+    with col2:
+        st.caption(f"Showing {start + 1}–{stop} of {total} (page {page + 1} of {pages})")
+    with col3:
+        st.button(
+            "Next",
+            icon=":material/chevron_right:",
+            key=f"{key}_page_next",
+            on_click=turn_page,
+            args=(key, 1),
+            disabled=page >= pages - 1,
+        )
+    with col4:
+        st.selectbox(
+            "Per page",
+            options=PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+            format_func=lambda n: f"{n} per page",
+            key=f"{key}_page_size",
+            on_change=reset_page,
+            args=(key,),
+            label_visibility="collapsed",
+        )
+
+
+# --- Display records ---
+# Everything a directory card prints, formatted once per snapshot / projection version (see get_display_records())
+# instead of per card per rerun. Records keep the frame's row order, so selection positions index them too.
+
+# Staff directory badges
+POSITION_BADGES = {
+    'Exec': 'Exec Staff', 
+    'CTA': 'CTA', 
+    'TTL': 'TTL', 
+    'APA': 'APA',
+    'I': 'Investigator',
+    'VA': 'Victim Advocate',
+    'LA': 'Legal Assistant',
+    'SS': 'Support Staff',
+    'INTERN': 'Intern',
+    'PET': 'Paw-secuting Attorney 🐾'
+}
+LOCATION_BADGES = {
+    'Dt-11': 'Downtown, 11th',
+    'Dt-10': 'Downtown, 10th',
+    'Dt-9': 'Downtown, 9th',
+    'Dt-7M': 'Downtown, 7M',
+    'Indy': 'Eastern Jack, Indy',
+    'FSD': 'Downtown, FSD'
+}
+
+# Court directory position badges: (color, title); 'Exec' alone if the unit is also 'Exec'
+COURT_POSITION_BADGES = {
+    'Exec': ("red", "Executive Staff"),
+    'CTA': ("orange", "Chief Trial Attorney"),
+    'TTL': ("green", "Trial Team Leader"),
+    'APA': ("blue", "Assistant Prosecuting Attorney"),
+}
+COURT_LOCATIONS = {
+    'Dt-11': "Downtown Courthouse, 11th floor",
+    'Dt-10': "Downtown Courthouse, 10th floor",
+    'Dt-9': "Downtown Courthouse, 9th floor (COMBAT)",
+    'Dt-7M': "Downtown Courthouse, 7M",
+    'Indy': "Eastern Jackson Courthouse, Independence",
+    'FSD': "Family Support Division",
+}
+
+# Define text_column()
+def text_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """String column with missing values as <NA> (or all <NA> if df doesn't have col)"""
+    if col not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="string")
+    return df[col].astype("string")
+
+# Define phone_numbers()
+def phone_numbers(phones: pd.Series) -> pd.Series:
+    """"8168811234" -> "816-881-1234"; other values as-is (missing -> <NA>)"""
+    text = phones.astype("string")
+    return text.where(text.str.len() != 10, text.str[:3] + "-" + text.str[3:6] + "-" + text.str[6:])
+
+# Define phone_lines()
+def phone_lines(phones: pd.Series) -> pd.Series:
+    """"8168811234" -> "816-881-1234 (ext. 1234)" (extension for 816-881 desk lines); other values as-is"""
+    text = phones.astype("string")
+    formatted = phone_numbers(text)
+    has_ext = text.str.startswith("816881").fillna(False).astype(bool)
+    return formatted.where(~has_ext, formatted + " (ext. " + text.str[-4:] + ")").fillna("None")
+
+# Define display_names()
+def display_names(df: pd.DataFrame) -> pd.Series:
+    """Preferred (or first) name + last name"""
+    preferred = text_column(df, "Preferred Name").fillna("")
+    first = text_column(df, "First Name").fillna("").str.strip()
+    last = text_column(df, "Last Name").fillna("").str.strip()
+    return preferred.str.strip().where(preferred != "", first) + " " + last
+
+# Define unit_labels()
+def unit_labels(df: pd.DataFrame, missing: str | None = ":red[???]") -> pd.Series:
+    """'Assigned Unit' list joined with " / " (missing if empty)"""
+    return df["Assigned Unit"].map(lambda units: " / ".join(units) if units is not None and len(units) else missing)
+
+# Define headshot_ids()
+def headshot_ids(df: pd.DataFrame) -> pd.Series:
+    """Cloudinary public ID per PhotoID (None if the row has no photo, or the latest headshot scan didn't find it)"""
+    public_ids = df["PhotoID"].map(lambda photo_id: HEADSHOT_FOLDER + photo_id.strip() if isinstance(photo_id, str) else None)
+    assets = get_headshot_scan()["assets"] # None until the first scan finishes -- trust every PhotoID
+    if assets is not None:
+        public_ids = public_ids.map(lambda public_id: public_id if public_id in assets else None)
+    return public_ids
+
+# Define headshot_urls()
+def headshot_urls(public_ids: pd.Series, size: str = "card") -> pd.Series:
+    """Sized Cloudinary URL per public ID for st.image() (None -> render the JCPAO logo)"""
+    return public_ids.map(lambda public_id: headshot_url(public_id, size, HEADSHOT_IMAGE_DPR) if public_id else None)
+
+# Define headshot_source()
+def headshot_source(record: pd.Series, size: str = "card"):
+    """st.image() source of a card's headshot: local thumbnail bytes if the headshot store is on, else its URL (None -> logo)"""
+    public_id = record["Headshot ID"]
+    if not isinstance(public_id, str) or get_headshot_store() is None:
+        return record["Headshot URL"]
+    return headshot_bytes(public_id, size)
+
+# Define thumbnail_srcsets()
+def thumbnail_srcsets(public_ids: pd.Series) -> pd.Series:
+    """HTML card grid thumbnail srcset per public ID (None -> the JCPAO logo)"""
+    return public_ids.map(lambda public_id: headshot_srcset(public_id, "thumb") if public_id else None)
+
+# Define staff_records()
+def staff_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Staff directory card fields, plus the whole card as an HTML fragment (see render_card_grid())"""
+    public_ids = headshot_ids(df)
+    units = unit_labels(df, missing=None)
+    positions = text_column(df, "Position").map(lambda x: POSITION_BADGES.get(x, x)).astype("string").fillna("None")
+    locations = text_column(df, "Office Location").map(lambda x: LOCATION_BADGES.get(x, x)).astype("string").fillna("None")
+    birthdays = text_column(df, "DOB Month").fillna(" ") + "/" + text_column(df, "DOB Day").fillna(" ")
+
+    records = pd.DataFrame({
+        "Headshot ID": public_ids,
+        "Headshot URL": headshot_urls(public_ids),
+        "Display Name": display_names(df),
+        "Job Title": df["Job Title"].astype("string").fillna("None"),
+        "Badge Line": (
+            ":green-badge[**" + positions + "**]"
+            + ":blue-badge[**" + units.fillna(":red[???]") + "**]"
+            + ":orange-badge[🏢 **" + locations + "**]"
+            + ":violet-badge[🎉 **" + birthdays + "**]"
+        ),
+        "Work Phone": phone_lines(df["Work Phone #"]),
+        "Work Email Address": df["Work Email Address"],
+        "Personal Phone": phone_numbers(df["Personal Phone #"]).fillna("None"), # No desk extension
+    }, index=df.index)
+
+    records["Card HTML"] = [
+        card_html(
+            photo, name, title,
+            badge_html("green", position) + badge_html("blue", unit) + badge_html("orange", f"🏢 {location}") + badge_html("violet", f"🎉 {birthday}"),
+            [("Work Phone", work_phone), ("Work Email", email), ("Personal Phone", personal_phone)],
+        )
+        for photo, name, title, position, unit, location, birthday, work_phone, email, personal_phone in zip(
+            thumbnail_srcsets(public_ids), records["Display Name"], records["Job Title"], positions, units, locations, birthdays,
+            records["Work Phone"], records["Work Email Address"], records["Personal Phone"],
+        )
+    ]
+    return records
+
+# Define court_position_parts()
+def court_position_parts(position: str, unit: str) -> tuple[str, str] | None:
+    """(badge color, text) of a court position, e.g. ("blue", "Assistant Prosecuting Attorney - GCU")"""
+    if position not in COURT_POSITION_BADGES:
+        return None
+    color, title = COURT_POSITION_BADGES[position]
+    if position == 'Exec' and unit == 'Exec':
+        return color, title
+    return color, f"{title} - {unit}"
+
+# Define court_position_badge()
+def court_position_badge(position: str, unit: str) -> str:
+    """Colored position badge, e.g. ":blue-badge[**Assistant Prosecuting Attorney - GCU**]" """
+    parts = court_position_parts(position, unit)
+    return f":{parts[0]}-badge[**{parts[1]}**]" if parts else ""
+
+# Define court_records()
+def court_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Court directory card fields (plus the raw columns of the contact table and the card as HTML)"""
+    public_ids = headshot_ids(df)
+    units = unit_labels(df, missing=None).str.replace("Drug", "Drug Court", regex=False)
+    positions = text_column(df, "Position").tolist()
+    locations = text_column(df, "Office Location")
+
+    records = pd.DataFrame({
+        "Headshot ID": public_ids,
+        "Headshot URL": headshot_urls(public_ids),
+        "Full Name": df["Full Name"],
+        "Last Name": df["Last Name"],
+        "Job Title": df["Job Title"].astype("string").fillna("None"),
+        "Position Badge": [court_position_badge(p, u) for p, u in zip(positions, units.fillna(":red[???]").tolist())],
+        "Office Location": locations.map(lambda x: COURT_LOCATIONS.get(x, x)).astype("string").fillna("None"),
+        "Work Email Address": df["Work Email Address"],
+        "Work Phone #": df["Work Phone #"],
+        "Work Phone": phone_lines(df["Work Phone #"]),
+    }, index=df.index)
+
+    records["Card HTML"] = [
+        card_html(
+            photo, name, title,
+            badge_html(*court_position_parts(position, unit or "???")) if position in COURT_POSITION_BADGES else "",
+            [("Office Location", location), ("Email Address", email), ("Work Phone", work_phone)],
+        )
+        for photo, name, title, position, unit, location, email, work_phone in zip(
+            thumbnail_srcsets(public_ids), records["Full Name"], records["Job Title"], positions, units,
+            records["Office Location"], records["Work Email Address"], records["Work Phone"],
+        )
+    ]
+    return records
+
+# Define birthday_records()
+def birthday_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Birthday card fields: headshot and "Name\n:violet-badge[🎉**Mar 3rd**]" caption"""
+    dob = pd.to_datetime(df["DOB"], errors="coerce")
+    public_ids = headshot_ids(df)
+    dates = dob.dt.strftime("%b") + " " + dob.dt.day.map(lambda day: ordinal(int(day)) if pd.notna(day) else "")
+    return pd.DataFrame({
+        "Headshot ID": public_ids,
+        "Headshot URL": headshot_urls(public_ids, "birthday"),
+        "Caption": display_names(df) + "\n:violet-badge[🎉**" + dates.astype("string").fillna("") + "**]",
+    }, index=df.index)
+
+RECORD_BUILDERS = {
+    "staff": staff_records,
+    "court": court_records,
+    "birthdays": birthday_records,
+}
+
+# Define display_records()
+def display_records(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """"staff" / "court" / "birthdays" card fields of df, in df's row order"""
+    if df.empty:
+        return pd.DataFrame(index=df.index)
+    return RECORD_BUILDERS[kind](df)
+
+# Define get_display_records()
+def get_display_records(view: dict, kind: str) -> pd.DataFrame:
+    """
+    Display records of a whole directory view, built once per snapshot / projection version and rebuilt
+    (replacing the previous ones) when the headshot scan finds a different set of headshots
+    """
+    scan_version = get_headshot_scan()["version"]
+    built = view["derived"].get(f"{kind}_records")
+    if built is None or built[0] != scan_version:
+        built = view["derived"][f"{kind}_records"] = (scan_version, display_records(view["frame"], kind))
+    return built[1]
+
+
+# --- Contact table ---
+
+# Court view column -> contact table header
+CONTACT_TABLE_COLUMNS = {
+    "Full Name": "Attorney Name",
+    "Work Email Address": "Email Address",
+    "Work Phone #": "Phone Number",
+}
+
+CONTACT_ROW_HEIGHT = 35.2 # px per st.dataframe row
+CONTACT_TABLE_HEIGHT = 600 # px -- longer tables scroll inside the (virtualized) grid
+
+# Define contact_records()
+def contact_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Attorney name / email / phone table of court rows, in df's row order (court frames are sorted by name)"""
+    contacts = df.reindex(columns=list(CONTACT_TABLE_COLUMNS)).rename(columns=CONTACT_TABLE_COLUMNS).reset_index(drop=True)
+    contacts["Phone Number"] = phone_numbers(contacts["Phone Number"])
+    return contacts
+
+# Define get_contact_table()
+def get_contact_table(view: dict, filters: dict) -> pd.DataFrame:
+    """Contact table of the rows matching the sidebar filters (built once per filter state and view version)"""
+    key = "contact_table " + repr(sorted(filters.items()))
+    return derived(view, key, lambda: contact_records(view["frame"].iloc[get_facet_index(view).positions(filters)]))
+
+# Define contact_table_height()
+def contact_table_height(rows: int) -> int:
+    """Grid height: fits short tables, fixed (scrolling) for long ones"""
+    return min(int(CONTACT_ROW_HEIGHT * (rows + 1)) + 3, CONTACT_TABLE_HEIGHT)
+
+
+# --- HTML card grid ---
+# Alternative to the per-card Streamlit elements (~10 delta messages per card): each record carries its card
+# as an escaped HTML fragment, and a page of cards goes to the browser as one st.html() grid.
+
+CARD_LOGO_SIZE = 160 # px -- embedded once per grid, in the stylesheet
+
+# Badge (background, text) colors, matching Streamlit's badge palette
+BADGE_COLORS = {
+    "green": ("#dcfce7", "#15803d"),
+    "blue": ("#dbeafe", "#1d4ed8"),
+    "orange": ("#ffedd5", "#c2410c"),
+    "violet": ("#ede9fe", "#6d28d9"),
+    "red": ("#fee2e2", "#b91c1c"),
+}
+
+CARD_CSS = """
+.jcpao-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(340px, 1fr)); gap: 1rem; }
+.jcpao-card { display: flex; gap: 1rem; align-items: center; padding: 0.75rem; border: 1px solid rgba(49, 51, 63, 0.2); border-radius: 0.5rem; }
+.jcpao-photo { flex: 0 0 120px; height: 120px; border-radius: 0.5rem; object-fit: cover; background: center / contain no-repeat; }
+.jcpao-logo { background-image: url("{logo}"); }
+.jcpao-body h3 { margin: 0; padding: 0; font-size: 1.25rem; }
+.jcpao-body p { margin: 0.15rem 0; font-size: 0.9rem; }
+.jcpao-title { font-weight: 600; opacity: 0.8; }
+.jcpao-badge { display: inline-block; margin: 0.1rem 0.2rem 0.1rem 0; padding: 0 0.4rem; border-radius: 0.25rem; font-size: 0.8rem; font-weight: 600; }
+""" + "".join(f".jcpao-{name} {{ background: {bg}; color: {fg}; }}\n" for name, (bg, fg) in BADGE_COLORS.items())
+
+# Define badge_html()
+def badge_html(color: str, text) -> str:
+    """One colored badge (text is escaped; missing text shows as "???")"""
+    text = "???" if text is None or pd.isna(text) else text
+    return f'<span class="jcpao-badge jcpao-{color}">{html.escape(str(text))}</span>'
+
+# Define card_html()
+def card_html(photo_srcset, name, title, badges: str, lines: list) -> str:
+    """One card: headshot thumbnail srcset (or logo), name, title, pre-built badge HTML and (label, value) lines, all escaped"""
+    if isinstance(photo_srcset, str):
+        src = photo_srcset.split(" ", 1)[0] # 1x URL, for browsers without srcset
+        photo = (
+            f'<img class="jcpao-photo" src="{html.escape(src)}" srcset="{html.escape(photo_srcset)}" '
+            f'alt="{html.escape(str(name))}" loading="lazy">'
+        )
+    else:
+        photo = '<div class="jcpao-photo jcpao-logo"></div>'
+    details = "".join(f"<p><b>{html.escape(label)}:</b> {html.escape(str(value))}</p>" for label, value in lines)
+    return (
+        f'<div class="jcpao-card">{photo}<div class="jcpao-body">'
+        f'<h3>{html.escape(str(name))}</h3><p class="jcpao-title">{html.escape(str(title))}</p>'
+        f"<div>{badges}</div>{details}</div></div>"
+    )
+
+# Define render_card_grid()
+def render_card_grid(records: pd.DataFrame):
+    """Emit a page of display records as a single HTML grid fragment"""
+    style = CARD_CSS.replace("{logo}", asset_data_uri(JCPAO_LOGO_SMALL, CARD_LOGO_SIZE))
+    st.html(f"<style>{style}</style><div class=\"jcpao-grid\">{''.join(records['Card HTML'])}</div>")
@@ -0,0 +1,319 @@
+"""
+File: directory_search.py
+Function: In-memory name index for directory search (no Streamlit / database dependencies)
+"""
+
+import unicodedata
+import time
+import numpy as np
+import pandas as pd
+
+
+# --- Name index ---
+
+# Name columns searched by the staff / court directories
+SEARCH_COLUMNS = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
+
+# Longest n-gram with its own posting list; longer queries intersect their trigram postings
+MAX_GRAM = 3
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+# Name columns matched by fuzzy search (middle names / suffixes only add noise to typo matching)
+FUZZY_COLUMNS = ["Full Name", "First Name", "Last Name", "Preferred Name"]
+
+# Hard limit on one fuzzy query: the Soundex and edit-distance scans and the row scoring stop here,
+# and the query ranks what it has found (the first chunk of each token's matches is always scored)
+FUZZY_TIME_BUDGET = 0.05 # seconds
+
+# Words processed between deadline checks
+DEADLINE_CHECK_EVERY = 64
+
+# Define normalize_name()
+def normalize_name(value) -> str:
+    """Lower-case (casefold), accent-stripped name; None / NaN become an empty string"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+# Define name_tokens()
+def name_tokens(name: str) -> list:
+    """Word tokens of a normalized name ("o'neil-smith" -> ["o", "neil", "smith"])"""
+    return "".join(ch if ch.isalnum() else " " for ch in name).split()
+
+# Define name_grams()
+def name_grams(name: str) -> set:
+    """All substrings of name of length 1..MAX_GRAM"""
+    return {name[i:i + n] for n in range(1, MAX_GRAM + 1) for i in range(len(name) - n + 1)}
+
+# --- Fuzzy matching helpers ---
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# Define soundex()
+def soundex(token: str) -> str:
+    """American Soundex code of a normalized token ("jon" / "john" -> "J500"); "" if it has no letters"""
+    letters = [ch for ch in token if "a" <= ch <= "z"]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    last = SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw": # h / w don't separate letters with the same code; vowels do
+            last = digit
+    return code.ljust(4, "0")
+
+# Define edit_distance()
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Edit distance (insert / delete / substitute / swap adjacent letters); max_distance + 1 once it's exceeded"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > max_distance: # Every path already costs too much
+            return max_distance + 1
+        before, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+# Define word_bigrams_of()
+def word_bigrams_of(token: str) -> set:
+    """Letter pairs of a token padded with ^ / $ ("jon" -> ^j, jo, on, n$)"""
+    padded = f"^{token}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+# Define max_typos()
+def max_typos(token: str) -> int:
+    """Edits tolerated for a query token of this length"""
+    return 1 if len(token) <= 4 else 2
+
+
+class NameIndex:
+    """
+    Inverted index over the name columns of one directory frame.
+
+    search() returns the (sorted) row positions whose name columns contain the query as a substring,
+    prefix() those with a name word starting with the query. Positions index the frame the index was
+    built from -- use them with frame.iloc[...] on that same frame only.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list = SEARCH_COLUMNS):
+        columns = [col for col in columns if col in df.columns]
+        self.size = len(df)
+
+        # Per row: normalized column values, for verifying candidates of long queries
+        self.names = [
+            [name for name in (normalize_name(value) for value in values) if name]
+            for values in zip(*(df[col].tolist() for col in columns))
+        ] if columns else [[] for _ in range(self.size)]
+
+        postings = {}
+        words = []
+        for row, names in enumerate(self.names):
+            grams = set()
+            for name in names:
+                grams.update(name_grams(name))
+                words.extend((token, row) for token in name_tokens(name))
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+
+        # Rows are visited in order, so every posting list is already sorted and unique
+        self.postings = {gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+        words.sort()
+        self.words = np.array([token for token, _ in words], dtype=object)
+        self.word_rows = np.array([row for _, row in words], dtype=np.int64)
+
+        # Fuzzy keys: word -> rows, plus the distinct words grouped by length and by Soundex code
+        fuzzy_words = {}
+        for col in FUZZY_COLUMNS:
+            if col not in df.columns:
+                continue
+            for row, value in enumerate(df[col].tolist()):
+                for token in name_tokens(normalize_name(value)):
+                    fuzzy_words.setdefault(token, set()).add(row)
+        self.fuzzy_rows = {token: sorted(rows) for token, rows in fuzzy_words.items()}
+        self.fuzzy_words = np.array(sorted(fuzzy_words), dtype=object)
+        self.word_lengths = np.array([len(token) for token in self.fuzzy_words], dtype=np.int64)
+        word_bigrams = {}
+        self.words_by_sound = {}
+        for i, token in enumerate(self.fuzzy_words):
+            for bigram in word_bigrams_of(token):
+                word_bigrams.setdefault(bigram, []).append(i)
+            self.words_by_sound.setdefault(soundex(token), []).append(token)
+        self.word_bigrams = {bigram: np.array(ids, dtype=np.int64) for bigram, ids in word_bigrams.items()}
+
+    # Define search()
+    def search(self, text: str) -> np.ndarray:
+        """Row positions whose name columns contain text (all rows if text is blank)"""
+        query = normalize_name(text)
+        if not query:
+            return np.arange(self.size)
+        if len(query) <= MAX_GRAM:
+            return self.postings.get(query, EMPTY_POSITIONS)
+
+        # Rows containing every trigram of the query, smallest posting list first
+        grams = sorted(
+            (self.postings.get(query[i:i + MAX_GRAM], EMPTY_POSITIONS) for i in range(len(query) - MAX_GRAM + 1)),
+            key=len,
+        )
+        candidates = grams[0]
+        for rows in grams[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+
+        # Trigrams can match in different places -- confirm the whole query appears in one column
+        return np.array(
+            [row for row in candidates if any(query in name for name in self.names[row])],
+            dtype=np.int64,
+        )
+
+    # Define refine()
+    def refine(self, positions: np.ndarray, text: str) -> np.ndarray:
+        """Subset of positions (e.g. an earlier search's result) whose name columns contain text"""
+        query = normalize_name(text)
+        if not query:
+            return positions
+        return np.array(
+            [row for row in positions if any(query in name for name in self.names[row])],
+            dtype=np.int64,
+        )
+
+    # Define prefix()
+    def prefix(self, text: str) -> np.ndarray:
+        """Row positions with a name word starting with text (all rows if text is blank)"""
+        query = normalize_name(text)
+        if not query:
+            return np.arange(self.size)
+        start = np.searchsorted(self.words, query, side="left")
+        stop = np.searchsorted(self.words, query + "\U0010ffff", side="left")
+        return np.unique(self.word_rows[start:stop])
+
+    # Define word_matches()
+    def word_matches(self, token: str, deadline: float) -> dict:
+        """Indexed words close to token -> edit distance (prefix matches count as exact)"""
+        limit = max_typos(token)
+        matches = {}
+
+        # Words starting with the token (still typing) and words that sound the same
+        start = np.searchsorted(self.fuzzy_words, token, side="left")
+        stop = np.searchsorted(self.fuzzy_words, token + "\U0010ffff", side="left")
+        matches.update(dict.fromkeys(self.fuzzy_words[start:stop], 0))
+        for i, word in enumerate(self.words_by_sound.get(soundex(token), [])):
+            if i % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                return matches
+            if word not in matches:
+                matches[word] = min(edit_distance(token, word, len(token) + len(word)), limit + 1)
+
+        # Typos: each edit breaks at most two letter pairs, so only words sharing enough pairs with the
+        # token (and of similar length) can be within the limit -- verify those, until the budget runs out
+        bigrams = word_bigrams_of(token)
+        needed = len(token) + 1 - 2 * limit
+        if needed < 1:
+            return matches
+        postings = [self.word_bigrams[bigram] for bigram in bigrams if bigram in self.word_bigrams]
+        if not postings:
+            return matches
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.fuzzy_words))
+        candidates = np.flatnonzero((shared >= needed) & (np.abs(self.word_lengths - len(token)) <= limit))
+        for i, word in enumerate(self.fuzzy_words[candidates[np.argsort(-shared[candidates], kind="stable")]]):
+            if i % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            if word not in matches:
+                distance = edit_distance(token, word, limit)
+                if distance <= limit:
+                    matches[word] = distance
+        return matches
+
+    # Define fuzzy()
+    def fuzzy(self, text: str, budget: float = FUZZY_TIME_BUDGET) -> np.ndarray:
+        """
+        Row positions matching every word of text by prefix, sound (Soundex) or a small number of typos,
+        best matches first (ties keep frame order). All rows if text is blank.
+        Stops scanning and scoring after budget seconds and ranks the candidates found so far.
+        """
+        tokens = name_tokens(normalize_name(text))
+        if not tokens:
+            return np.arange(self.size)
+        deadline = time.perf_counter() + budget
+
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            matches = sorted(self.word_matches(token, deadline).items(), key=lambda match: match[1]) # Closest words first
+            for i, (word, distance) in enumerate(matches):
+                if i and i % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                    break
+                for row in self.fuzzy_rows[word]:
+                    if distance < token_scores.get(row, distance + 1):
+                        token_scores[row] = distance
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {row: score + token_scores[row] for row, score in scores.items() if row in token_scores}
+            if not scores:
+                return EMPTY_POSITIONS
+
+        ranked = sorted(scores, key=lambda row: (scores[row], row))
+        return np.array(ranked, dtype=np.int64)
+
+
+# --- Benchmark ---
+
+if __name__ == "__main__":
+    # python directory_search.py [rows] -- index build and query latency on synthetic names
+    import random
+    import sys
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(0)
+    firsts = ["John", "Jon", "Jonathan", "Maria", "María", "Mariah", "Stephen", "Steven", "Catherine", "Kathryn", "Zoë", "Sean", "Shawn", "Aisha", "Nguyen", "Jose", "José"]
+    lasts = ["Smith", "Smyth", "Schmidt", "Johnson", "Jonson", "Garcia", "García", "O'Neil", "Nuñez", "Peters", "Petersen", "Stone", "Lee", "Li", "Müller", "Miller", "Washington"]
+
+    def random_word() -> str:
+        return "".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(random.randint(3, 10))).title()
+
+    first = [random.choice(firsts) if random.random() < 0.3 else random_word() for _ in range(rows)]
+    last = [random.choice(lasts) if random.random() < 0.3 else random_word() for _ in range(rows)]
+    df = pd.DataFrame({
+        "First Name": first,
+        "Last Name": last,
+        "Full Name": [f"{f} {l}" for f, l in zip(first, last)],
+        "Middle Name": None,
+        "Suffix": None,
+        "Preferred Name": [f if random.random() < 0.1 else None for f in first],
+    })
+
+    start = time.perf_counter()
+    index = NameIndex(df)
+    print(f"{rows} rows, {len(index.fuzzy_words)} distinct words: index built in {time.perf_counter() - start:.2f}s")
+
+    queries = ["jon", "smth", "garcai", "muller", "kathrin", "stephen peters", "jo", "washingtn", "zzzzzz", "o'neill"]
+    for name, method in [("substring", index.search), ("prefix", index.prefix), ("fuzzy", index.fuzzy)]:
+        timings = []
+        for query in queries * 5:
+            start = time.perf_counter()
+            method(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{name:>9}: p50 {timings[len(timings) // 2] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms")
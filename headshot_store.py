@@ -0,0 +1,309 @@
+"""
+File: headshot_store.py
+Function: Headshot image store -- pluggable image backends behind an on-disk LRU thumbnail cache (no Streamlit dependencies)
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import cloudinary.api
+import cloudinary.uploader
+from cloudinary import CloudinaryImage
+from PIL import Image, ImageOps
+
+
+# --- Backends ---
+# A backend holds the original headshots, addressed by Cloudinary public ID ("JCPAO_headshots/jsmith"):
+#   fetch(public_id) -> bytes | None    original image bytes (None if there is no such image)
+#   assets(prefix) -> {public_id: info} every image under a folder; info has "etag" (content hash), "bytes", "width", "height"
+#   upload(path, public_id)             store (or overwrite) an image file under a public ID
+#   invalidate(public_id)               purge CDN copies of an overwritten image (run on the upload pool, after uploads)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+# Cloudinary Admin API page size (its maximum)
+CLOUDINARY_PAGE_SIZE = 500
+FETCH_TIMEOUT = 10 # seconds
+
+# Define content_hash()
+def content_hash(data: bytes) -> str:
+    """Hex digest identifying an image's content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalHeadshotBackend:
+    """
+    Folder of images named by public ID (root/JCPAO_headshots/jsmith.jpg) -- a stand-in for Cloudinary,
+    so the pages can render offline and tests / benchmarks don't touch the CDN.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    # Define path()
+    def path(self, public_id: str) -> Path | None:
+        """Image file of a public ID (any IMAGE_SUFFIXES extension), None if missing"""
+        for suffix in IMAGE_SUFFIXES:
+            path = self.root / f"{public_id}{suffix}"
+            if path.is_file():
+                return path
+        return None
+
+    # Define fetch()
+    def fetch(self, public_id: str) -> bytes | None:
+        path = self.path(public_id)
+        return path.read_bytes() if path else None
+
+    # Define assets()
+    def assets(self, prefix: str = "") -> dict:
+        assets = {}
+        folder, _, start = prefix.rpartition("/")
+        base = self.root / folder
+        if not base.is_dir():
+            return assets
+        for path in sorted(base.rglob(f"{start}*")):
+            if path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            public_id = path.relative_to(self.root).with_suffix("").as_posix()
+            if not public_id.startswith(prefix):
+                continue
+            data = path.read_bytes()
+            with Image.open(path) as image:
+                width, height = image.size
+            assets[public_id] = {"etag": content_hash(data), "bytes": len(data), "width": width, "height": height}
+        return assets
+
+    # Define upload()
+    def upload(self, path: str | Path, public_id: str):
+        path = Path(path)
+        existing = self.path(public_id)
+        if existing: # Replace it, even if saved with another extension
+            existing.unlink()
+        target = self.root / f"{public_id}{path.suffix.lower()}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+
+    # Define invalidate()
+    def invalidate(self, public_id: str):
+        pass # No CDN in front of a folder
+
+
+class CloudinaryHeadshotBackend:
+    """Cloudinary media library (uses the global cloudinary.config() -- see photo.py)"""
+
+    # Define fetch()
+    def fetch(self, public_id: str) -> bytes | None:
+        try:
+            with urlopen(CloudinaryImage(public_id).build_url(version=None), timeout=FETCH_TIMEOUT) as response:
+                return response.read()
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    # Define assets()
+    def assets(self, prefix: str = "") -> dict:
+        assets = {}
+        options = {"type": "upload", "resource_type": "image", "prefix": prefix, "max_results": CLOUDINARY_PAGE_SIZE}
+        while True:
+            page = cloudinary.api.resources(**options)
+            for resource in page["resources"]:
+                assets[resource["public_id"]] = {
+                    "etag": resource.get("etag") or f"v{resource['version']}", # Listings may omit the MD5 etag; versions change on overwrite
+                    "bytes": resource["bytes"],
+                    "width": resource["width"],
+                    "height": resource["height"],
+                }
+            if not page.get("next_cursor"):
+                return assets
+            options["next_cursor"] = page["next_cursor"]
+
+    # Define upload()
+    def upload(self, path: str | Path, public_id: str):
+        cloudinary.uploader.upload(str(path), public_id=public_id, overwrite=True, invalidate=False)
+
+    # Define invalidate()
+    def invalidate(self, public_id: str):
+        cloudinary.uploader.explicit(public_id, type="upload", invalidate=True)
+
+
+# --- Thumbnail cache ---
+
+THUMBNAIL_CACHE_BYTES = 256 * 2**20 # Evict least recently used thumbnails beyond this
+THUMBNAIL_CACHE_LOW_WATER = 0.9 # ...down to this fraction of the limit
+THUMBNAIL_QUALITY = 80 # WebP
+
+# Backend listings (public ID -> content hash) are re-read at most this often
+ETAG_TTL = 600 # seconds
+
+# Define resize_image()
+def resize_image(data: bytes, width: int, height: int | None = None) -> bytes:
+    """WebP thumbnail: width x height cropped around the upper center (headshots), or width wide keeping the aspect ratio"""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        if height is None:
+            image.thumbnail((width, image.height * width // max(image.width, 1) or 1)) # Never upscales
+        else:
+            image = ImageOps.fit(image, (width, height), centering=(0.5, 0.35))
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+class HeadshotStore:
+    """
+    Resized headshots served from local bytes. Thumbnails are cached in cache_dir as WebP files named by
+    public ID, content hash and size, so a re-uploaded photo gets new entries and stale ones age out;
+    file mtimes record last use, and the least recently used files are evicted past max_bytes.
+
+    Content hashes come from a backend listing, re-read in a background thread once older than etag_ttl
+    (lookups keep the previous listing meanwhile) or handed over by the integrity scan (see set_etags()).
+    """
+
+    def __init__(self, backend, cache_dir: str | Path, max_bytes: int = THUMBNAIL_CACHE_BYTES, prefix: str = "", etag_ttl: float = ETAG_TTL):
+        self.backend = backend
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.etag_ttl = etag_ttl
+        self.etags = {}
+        self.etags_loaded = None
+        self.refreshing = False
+        self.first_listing = threading.Event() # Set once the first listing attempt finishes
+        self.lock = threading.Lock()
+        self.used = sum(path.stat().st_size for path in self.cache_dir.glob("*.webp"))
+
+    # Define etag()
+    def etag(self, public_id: str) -> str | None:
+        """Content hash of a headshot, None if the backend has no such image"""
+        with self.lock:
+            loaded = self.etags_loaded
+            refresh = (loaded is None or time.monotonic() - loaded > self.etag_ttl) and not self.refreshing
+            if refresh:
+                self.refreshing = True
+                if loaded is None:
+                    self.first_listing.clear()
+
+        if refresh and loaded is None: # Nothing to serve yet -- list now (raises backend errors)
+            self.refresh_etags()
+        elif refresh:
+            threading.Thread(target=self.refresh_etags, args=(True,), daemon=True).start()
+        elif loaded is None: # Another lookup is making the first listing
+            self.first_listing.wait(FETCH_TIMEOUT)
+        return self.etags.get(public_id)
+
+    # Define refresh_etags()
+    def refresh_etags(self, background: bool = False):
+        """Re-list the backend, without holding the lock (a listing can take seconds)"""
+        try:
+            self.set_etags(self.backend.assets(self.prefix))
+        except Exception: # Backend errors vary (HTTP, Cloudinary API, disk)
+            if not background:
+                raise
+            with self.lock: # Keep the previous listing, retry after another etag_ttl
+                self.etags_loaded = time.monotonic()
+        finally:
+            with self.lock:
+                self.refreshing = False
+            self.first_listing.set()
+
+    # Define set_etags()
+    def set_etags(self, assets: dict):
+        """Replace the content hashes with a backend listing ({public_id: info}, see the backends)"""
+        etags = {public_id: info["etag"] for public_id, info in assets.items() if public_id.startswith(self.prefix)}
+        with self.lock:
+            self.etags = etags
+            self.etags_loaded = time.monotonic()
+
+    # Define forget()
+    def forget(self):
+        """Re-list the backend on the next lookup (after uploads)"""
+        with self.lock:
+            self.etags_loaded = None
+
+    # Define cache_path()
+    def cache_path(self, public_id: str, etag: str, width: int, height: int | None) -> Path:
+        name = public_id.replace("/", "__")
+        digest = hashlib.sha256(etag.encode()).hexdigest()[:16] # Etags aren't always file-name safe
+        return self.cache_dir / f"{name}-{digest}-{width}x{height or 0}.webp"
+
+    # Define thumbnail()
+    def thumbnail(self, public_id: str, width: int, height: int | None = None) -> bytes | None:
+        """Thumbnail bytes (see resize_image()), from the cache or resized from the backend; None if there is no such image"""
+        etag = self.etag(public_id)
+        if etag is None:
+            return None
+
+        path = self.cache_path(public_id, etag, width, height)
+        try:
+            data = path.read_bytes()
+            os.utime(path) # Mark as recently used
+            return data
+        except FileNotFoundError:
+            pass
+
+        original = self.backend.fetch(public_id)
+        if original is None:
+            return None
+        data = resize_image(original, width, height)
+
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path) # Atomic, so concurrent readers never see half a file
+        with self.lock:
+            self.used += len(data)
+            if self.used > self.max_bytes:
+                self.evict()
+        return data
+
+    # Define evict()
+    def evict(self):
+        """Delete least recently used thumbnails until the cache is under its low-water mark (call with self.lock held)"""
+        files = []
+        for path in self.cache_dir.glob("*.webp"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        self.used = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if self.used <= self.max_bytes * THUMBNAIL_CACHE_LOW_WATER:
+                break
+            path.unlink(missing_ok=True)
+            self.used -= size
+
+
+# --- Integrity scan ---
+# Reconciles the PhotoIDs the directory references with the images the store actually holds.
+
+# Originals larger than this are flagged (cards never need more than ~800 px)
+OVERSIZED_BYTES = 2 * 2**20
+OVERSIZED_PIXELS = 2400 # longest side
+
+# Define scan_headshots()
+def scan_headshots(assets: dict, photo_ids, prefix: str = "") -> dict:
+    """
+    Diff a listing (backend.assets(prefix)) against the directory's PhotoIDs:
+    "missing" PhotoIDs with no image, "orphaned" images no row references, "oversized" {public_id: info}.
+    """
+    referenced = {prefix + photo_id for photo_id in photo_ids if photo_id}
+    listed = set(assets)
+    return {
+        "missing": sorted(public_id[len(prefix):] for public_id in referenced - listed),
+        "orphaned": sorted(listed - referenced),
+        "oversized": {
+            public_id: info for public_id, info in sorted(assets.items())
+            if info["bytes"] > OVERSIZED_BYTES or max(info["width"], info["height"]) > OVERSIZED_PIXELS
+        },
+    }
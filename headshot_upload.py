@@ -0,0 +1,156 @@
+"""
+File: headshot_upload.py
+Function: Bulk headshot uploads -- parallel, resumable, skips unchanged files (no Streamlit dependencies)
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+# --- Bulk upload ---
+
+# Concurrent uploads (Cloudinary uploads are network-bound)
+UPLOAD_WORKERS = 8
+
+# Per-folder record of finished uploads, so a re-run skips unchanged files and resumes after failures
+MANIFEST_NAME = ".headshot_manifest.json"
+
+# Define file_hash()
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Define read_mapping()
+def read_mapping(csv_path: str | Path) -> list:
+    """
+    Upload mapping CSV rows: "File", "PhotoID", and optionally "Work Email Address" (the employee whose PhotoID
+    is saved) and "Pet Name" (set on pet photos -- the email is then the owner's, so the row is upload-only)
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        return [
+            {
+                "File": row["File"].strip(),
+                "PhotoID": row["PhotoID"].strip(),
+                "Work Email Address": (row.get("Work Email Address") or "").strip(),
+                "Pet Name": (row.get("Pet Name") or "").strip(),
+            }
+            for row in csv.DictReader(f)
+            if row.get("File") and row.get("PhotoID")
+        ]
+
+# Define load_manifest()
+def load_manifest(folder: Path) -> dict:
+    """
+    {file name: {"hash", "public_id", "invalidated", "saved"}} of the folder's finished uploads
+    ("invalidated": CDN copies purged, "saved": PhotoID written to the database)
+    """
+    try:
+        return json.loads((folder / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+# Define save_manifest()
+def save_manifest(folder: Path, manifest: dict):
+    tmp_path = folder / f"{MANIFEST_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    os.replace(tmp_path, folder / MANIFEST_NAME) # Atomic, so a crash mid-write keeps the previous manifest
+
+# Define upload_headshots()
+def upload_headshots(folder: str | Path, mapping: list, backend, update_photo_ids=None, folder_prefix: str = "", workers: int = UPLOAD_WORKERS) -> dict:
+    """
+    Upload a folder of headshots to an image store backend (see headshot_store.py).
+
+    mapping rows: see read_mapping(); each file is uploaded as folder_prefix + PhotoID.
+    Files whose content and target match the manifest are skipped. Uploads run on a bounded thread pool and
+    a failed file doesn't stop the others -- re-run to retry just the failures. Once the uploads finish, their
+    CDN copies are invalidated on the same pool (including ones an earlier run couldn't), then
+    update_photo_ids([(PhotoID, email), ...]) writes the new PhotoIDs in one transaction. Pet rows and rows
+    without an email are upload-only.
+
+    Returns {"uploaded": [...], "skipped": [...], "failed": {file: error}, "saved": int}.
+    """
+    folder = Path(folder)
+    manifest = load_manifest(folder)
+    manifest_lock = threading.Lock()
+    report = {"uploaded": [], "skipped": [], "failed": {}, "saved": 0}
+
+    pending = []
+    hashes = {} # File -> content hash
+    for row in mapping:
+        path = folder / row["File"]
+        if not path.is_file():
+            report["failed"][row["File"]] = "file not found"
+            continue
+        content = hashes[row["File"]] = file_hash(path)
+        public_id = folder_prefix + row["PhotoID"]
+        done = manifest.get(row["File"], {})
+        if done.get("hash") == content and done.get("public_id") == public_id:
+            report["skipped"].append(row["File"])
+        else:
+            pending.append((row, path, content, public_id))
+
+    # Define upload_one()
+    def upload_one(row, path, content, public_id):
+        backend.upload(path, public_id)
+        with manifest_lock: # Record each finished upload right away, so an interrupted run resumes here
+            manifest[row["File"]] = {"hash": content, "public_id": public_id, "invalidated": False, "saved": False}
+            save_manifest(folder, manifest)
+
+    # Define invalidate_one()
+    def invalidate_one(name):
+        backend.invalidate(manifest[name]["public_id"])
+        with manifest_lock:
+            manifest[name]["invalidated"] = True
+            save_manifest(folder, manifest)
+
+    # Define uploaded_rows()
+    def uploaded_rows():
+        """
+        (row, manifest entry) of files whose current content is uploaded under their current PhotoID, including
+        uploads from earlier interrupted runs (after a failed re-upload the manifest entry no longer matches)
+        """
+        for row in mapping:
+            done = manifest.get(row["File"], {})
+            if done.get("hash") == hashes.get(row["File"]) and done.get("public_id") == folder_prefix + row["PhotoID"]:
+                yield row, done
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(upload_one, *task): task[0]["File"] for task in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                report["uploaded"].append(futures[future])
+            except Exception as e: # Backend errors vary (HTTP, Cloudinary API, disk) -- report and move on
+                report["failed"][futures[future]] = str(e)
+
+        stale = dict.fromkeys(row["File"] for row, done in uploaded_rows() if done.get("invalidated") is False)
+        futures = {executor.submit(invalidate_one, name): name for name in stale}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e: # Stale CDN copies expire on their own -- don't hold up the database update; re-run to retry
+                report["failed"][f"{futures[future]} (CDN invalidation)"] = str(e)
+
+    # PhotoIDs to save: uploaded employee rows not saved yet
+    unsaved = [row for row, done in uploaded_rows() if done.get("saved") is False and row["Work Email Address"] and not row["Pet Name"]]
+
+    if unsaved and update_photo_ids is not None:
+        try:
+            report["saved"] = update_photo_ids([(row["PhotoID"], row["Work Email Address"]) for row in unsaved])
+        except Exception as e: # Database / rejected rows -- nothing was saved; re-run to retry
+            report["failed"]["database update"] = str(e)
+            return report
+        for row in unsaved:
+            manifest[row["File"]]["saved"] = True
+        save_manifest(folder, manifest)
+
+    return report
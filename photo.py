@@ -12,7 +12,14 @@ config = cloudinary.config(
 import cloudinary.uploader
 import cloudinary.api
 import time
+import threading
 from pathlib import Path 
+from functools import lru_cache
+
+from headshot_store import HeadshotStore, LocalHeadshotBackend, CloudinaryHeadshotBackend
+from headshot_store import scan_headshots
+from headshot_upload import upload_headshots, read_mapping
+from connect_data import update_photo_ids
 
 
 # Define load_photo() 
@@ -20,13 +27,147 @@ def load_photo(public_id):
     """Loads photo from Cloudinary with the provided public ID; returns img src URL that can be read into st.image()/st.markdown()"""
     return CloudinaryImage(public_id).build_url(version=None)
 
-# TODO - update upload_photo() function and add to special admin function page
-# Define upload_photo()
-def upload_photo():
-    cloudinary.uploader.upload(
-        "path/to/photo.jpg",
-        public_id="pet.dtarantino",
-        overwrite=True,
-        invalidate=True  # invalidates cached version so new image is served
+# Cloudinary folder of the staff / pet headshots (public ID = folder + PhotoID)
+HEADSHOT_FOLDER = "JCPAO_headshots/"
+
+# --- Sized headshot URLs ---
+# Cloudinary resizes / re-encodes on its CDN, so browsers download a thumbnail in the best format they
+# accept (f_auto) at an automatic quality (q_auto) instead of the full-resolution original.
+
+# Display size -> (width, height) in CSS px; height None keeps the aspect ratio (never upscaled)
+HEADSHOT_SIZES = {
+    "card": (400, None), # st.image(width=400) -- staff / court cards
+    "birthday": (250, None), # st.image(width=250) -- birthday cards
+    "thumb": (120, 120), # HTML card grid (square, cropped around the face)
+}
+
+# Device pixel ratios served for <img srcset> (st.image takes one URL -- it gets HEADSHOT_IMAGE_DPR)
+HEADSHOT_DPRS = (1, 2)
+HEADSHOT_IMAGE_DPR = 2
+
+# Define headshot_url()
+@lru_cache(maxsize=16384) # (public_id, size, dpr) -> URL; building one is pure string work, so no TTL
+def headshot_url(public_id: str, size: str = "card", dpr: int = 1) -> str:
+    """Cloudinary URL of a headshot resized for one HEADSHOT_SIZES display size and device pixel ratio"""
+    width, height = HEADSHOT_SIZES[size]
+    transformation = {"width": width, "dpr": dpr, "fetch_format": "auto", "quality": "auto"}
+    if height is None:
+        transformation["crop"] = "limit"
+    else:
+        transformation.update(height=height, crop="fill", gravity="face")
+    return CloudinaryImage(public_id).build_url(version=None, **transformation)
+
+# Define headshot_srcset()
+def headshot_srcset(public_id: str, size: str = "thumb") -> str:
+    """<img srcset> value with one URL per HEADSHOT_DPRS ratio, e.g. ".../dpr_1,... 1x, .../dpr_2,... 2x" """
+    return ", ".join(f"{headshot_url(public_id, size, dpr)} {dpr}x" for dpr in HEADSHOT_DPRS)
+
+# --- Headshot store ---
+# Off by default: cards link to the sized Cloudinary URLs above. With [headshots] serve_local = true in
+# secrets.toml, cards get thumbnail bytes from a local on-disk cache instead, filled from Cloudinary or,
+# with backend = "local", from a folder of images (local_root = "...") for offline use and tests.
+
+HEADSHOT_CACHE_DIR = ".cache/headshots"
+HEADSHOT_CACHE_MB = 256
+
+# Define headshot_backend()
+def headshot_backend():
+    """Image backend named by [headshots] backend in secrets.toml ("cloudinary" or "local")"""
+    settings = st.secrets.get("headshots", {})
+    if settings.get("backend", "cloudinary") == "local":
+        return LocalHeadshotBackend(settings["local_root"])
+    return CloudinaryHeadshotBackend()
+
+# Define get_headshot_store()
+@st.cache_resource(show_spinner=False)
+def get_headshot_store() -> HeadshotStore | None:
+    """Shared headshot store, or None if local serving is off"""
+    settings = st.secrets.get("headshots", {})
+    if not settings.get("serve_local", False):
+        return None
+    return HeadshotStore(
+        headshot_backend(),
+        settings.get("cache_dir", HEADSHOT_CACHE_DIR),
+        max_bytes=int(settings.get("cache_mb", HEADSHOT_CACHE_MB)) * 2**20,
+        prefix=HEADSHOT_FOLDER,
+    )
+
+# Define headshot_bytes()
+def headshot_bytes(public_id: str, size: str = "card") -> bytes | None:
+    """Local thumbnail of a headshot for one HEADSHOT_SIZES display size (None if missing or the store is unreachable)"""
+    width, height = HEADSHOT_SIZES[size]
+    try:
+        return get_headshot_store().thumbnail(public_id, width, height) # st.image() would scale larger bytes down to width anyway
+    except (OSError, cloudinary.exceptions.Error): # Network / disk / unreadable image -- show the logo instead
+        return None
+
+# --- Headshot integrity scan ---
+# A background job lists the image store every HEADSHOT_SCAN_TTL seconds; cards whose PhotoID isn't in the
+# latest listing show the logo instead of a broken image (see directory_render.headshot_ids()). Until the
+# first listing finishes -- or with [headshots] scan = false -- every PhotoID is trusted, as before.
+
+HEADSHOT_SCAN_TTL = 3600 # seconds
+
+# Define get_scan_store()
+@st.cache_resource(show_spinner=False)
+def get_scan_store() -> dict:
+    """Process-wide latest listing of the image store (store["assets"] is replaced, never mutated)"""
+    return {
+        "lock": threading.Lock(),
+        "version": 0, # Bumped when a listing finds a different set of headshots (cache key for data built from it)
+        "assets": None, # {public_id: info}, see the headshot_store backends
+        "scanned": None, # time.monotonic() of the last attempt
+        "error": None,
+    }
+
+# Define run_headshot_scan()
+def run_headshot_scan(scan_store: dict, backend, headshot_store: HeadshotStore | None = None):
+    """List the image store in the background (no Streamlit calls -- runs outside any script run)"""
+    try:
+        assets = backend.assets(HEADSHOT_FOLDER) # One paginated listing of the folder
+        changed = scan_store["assets"] is None or assets.keys() != scan_store["assets"].keys()
+        scan_store["assets"], scan_store["error"] = assets, None
+        if changed:
+            scan_store["version"] += 1
+        if headshot_store is not None: # Same listing -- saves the store its own re-list
+            headshot_store.set_etags(assets)
+    except (OSError, ValueError, cloudinary.exceptions.Error) as e: # Network / API / config errors -- keep serving the previous listing
+        scan_store["error"] = str(e)
+    finally:
+        scan_store["lock"].release()
+
+# Define get_headshot_scan()
+def get_headshot_scan() -> dict:
+    """Latest image store listing (see get_scan_store()), starting a background re-scan when it's stale"""
+    scan_store = get_scan_store()
+    if not st.secrets.get("headshots", {}).get("scan", True):
+        return scan_store
+    stale = scan_store["scanned"] is None or time.monotonic() - scan_store["scanned"] > HEADSHOT_SCAN_TTL
+    if stale and scan_store["lock"].acquire(blocking=False): # Released by run_headshot_scan()
+        scan_store["scanned"] = time.monotonic()
+        threading.Thread(target=run_headshot_scan, args=(scan_store, headshot_backend(), get_headshot_store()), daemon=True).start()
+    return scan_store
+
+# Define headshot_report()
+def headshot_report(photo_ids) -> dict:
+    """Missing / orphaned / oversized headshots for the given PhotoIDs, from a fresh listing (for admins)"""
+    photo_ids = [photo_id.strip() for photo_id in photo_ids if isinstance(photo_id, str) and photo_id.strip()]
+    assets = headshot_backend().assets(HEADSHOT_FOLDER)
+    return scan_headshots(assets, photo_ids, HEADSHOT_FOLDER)
+
+# --- Bulk upload ---
+
+# Define upload_photos()
+def upload_photos(folder, mapping_csv) -> dict:
+    """Upload a folder of headshots to Cloudinary per a File / PhotoID / Work Email Address / Pet Name CSV and save the employee PhotoIDs (see headshot_upload.py)"""
+    report = upload_headshots(
+        folder,
+        read_mapping(mapping_csv),
+        CloudinaryHeadshotBackend(),
+        update_photo_ids=update_photo_ids,
+        folder_prefix=HEADSHOT_FOLDER,
     )
-    return True
+    store = get_headshot_store()
+    if store is not None and report["uploaded"]:
+        store.forget() # Pick up the new content hashes
+    return report
@@ -10,51 +10,165 @@ from collections import Counter
 
 from streamlit_extras.metric_cards import style_metric_cards # https://arnaudmiribel.github.io/streamlit-extras/
 
-from connect_data import STAFF_VIEW
+from connect_data import get_projection, get_projection_view, derived
 from connect_data import ordinal
+from connect_data import enum_codes, enum_mask, UNIT_CODES, RACE_CODES
 
 # --- Load data ---
-staff_view = STAFF_VIEW.copy()  # "staff_view"
+
+# Define staff_df()
+def staff_df(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Default metric input: the shared "dashboard" projection of STAFF_VIEW (loaded on first use; don't mutate it)"""
+    return get_projection("dashboard") if df is None else df
+
+
+# --- Aggregate cube ---
+# Every count / percent table the dashboard shows, built in one vectorized pass over the projection and
+# cached with it (rebuilt only when the snapshot changes); the metric functions below just read it.
+
+POSITION_LABELS = {
+    'Exec': 'Executive Staff', 
+    'CTA': 'Chief Trial Attorneys', 
+    'TTL': 'Team Trial Leaders', 
+    'APA': 'Assistant Prosecuting Attorneys',
+    'I': 'Investigators',
+    'VA': 'Victim Advocates',
+    'LA': 'Legal Assistants',
+    'SS': 'Support Staff',
+    'INTERN': 'Interns'
+}
+
+UNIT_LABELS = {
+    'Exec': 'Executive Staff',
+    'GCU': 'General Crimes Unit (GCU)',
+    'SVU': 'Special Victims Unit (SVU)',
+    'VCU': 'Violent Crimes Unit (VCU)',
+    'CSU': 'Crime Strategies Unit (CSU)',
+    'COMBAT': 'COMBAT',
+    'Drug': 'Drug Court',
+    'FSD': 'Family Support Division',
+    'WARRANT': 'Warrant Desk'
+}
+
+LOCATION_LABELS = {
+    'Dt-11': 'Downtown (11th)',
+    'Dt-10': 'Downtown (10th)',
+    'Dt-9': 'Downtown (9th)',
+    'Dt-7M': 'Downtown (7M)',
+    'Indy': 'Independence',
+    'FSD': 'Family Support Division'
+}
+
+RACE_LABELS = {
+    "W": "White",
+    "B": "Black / African American",
+    "A": "Asian",
+    "H": "Hispanic / Latino",
+    "AIAN": "American Indian / Alaska Native",
+    "NHPI": "Native Hawaiian / Pacific Islander",
+    "O": "Other",
+    "Multiple": "Multiple"
+}
+
+GENDER_LABELS = {
+    "M": "Male",
+    "F": "Female",
+    "O": "Other / Prefer not to say"
+}
+
+# Summary metric -> positions counted
+SUMMARY_POSITIONS = {
+    "Executive Staff": ['Exec'],
+    "Total Attorneys": ['CTA', 'TTL', 'APA'],
+    "Total Support Staff": ['I', 'LA', 'VA', 'SS'],
+    "Total Interns": ['INTERN'],
+}
+
+# Define count_table()
+def count_table(counts: pd.Series, column: str, labels: dict, total: int | None = None) -> pd.DataFrame:
+    """Counts (indexed by code) as a [column, "Count", "Percent"] table, largest first; Percent of total (default: of all counts)"""
+    counts = counts.sort_values(ascending=False, kind="stable")
+    table = pd.DataFrame({column: counts.index.astype(str), "Count": counts.to_numpy()})
+    table[column] = table[column].replace(labels)
+    table["Percent"] = (table["Count"] / (counts.sum() if total is None else total) * 100).round(2)
+    return table
+
+# Define mask_counts()
+def mask_counts(mask: np.ndarray, codes: list) -> pd.Series:
+    """Rows with each code's bit set in an enum bitmask column (codes no row has are left out, as with explode())"""
+    counts = pd.Series(((mask[:, None] >> np.arange(len(codes))) & 1).sum(axis=0), index=codes)
+    return counts[counts > 0]
+
+# Define dashboard_mask()
+def dashboard_mask(df: pd.DataFrame, column: str, mask_column: str, codes: list) -> tuple:
+    """(codes, int64 bitmask) of an enum list column: the stored mask, or a new one if the lists hold codes it has no bit for"""
+    all_codes = enum_codes(df[column], codes)
+    if mask_column in df.columns and all_codes == codes:
+        return codes, df[mask_column].to_numpy().astype(np.int64)
+    return all_codes, enum_mask(df[column], all_codes).to_numpy().astype(np.int64)
+
+# Define build_dashboard_cube()
+def build_dashboard_cube(df: pd.DataFrame) -> dict:
+    """All dashboard aggregates of a staff frame (Position / Office Location / Sex columns, Assigned Unit / Race enum lists)"""
+    total = len(df)
+    unit_codes, unit_mask = dashboard_mask(df, "Assigned Unit", "Unit Mask", UNIT_CODES)
+    race_codes, race_mask = dashboard_mask(df, "Race", "Race Mask", RACE_CODES)
+
+    positions = df["Position"].value_counts(sort=False)
+    unit_counts = mask_counts(unit_mask, unit_codes)
+    race_counts = mask_counts(race_mask, race_codes)
+
+    # One race per person: the single code, "Multiple" or "Unknown"
+    race_bits = ((race_mask[:, None] >> np.arange(len(race_codes))) & 1).sum(axis=1)
+    single_race = np.array(race_codes)[np.log2(np.maximum(race_mask, 1)).astype(int)]
+    race_unique = pd.Series(np.select([race_bits == 0, race_bits > 1], ["Unknown", "Multiple"], default=single_race))
+
+    return {
+        "total": total,
+        "summary": {name: int(positions.reindex(codes, fill_value=0).sum()) for name, codes in SUMMARY_POSITIONS.items()},
+        "position": count_table(positions, "Position", POSITION_LABELS),
+        "unit": count_table(unit_counts, "Assigned Unit", UNIT_LABELS, total),
+        "unit_n": int(unit_counts.sum() + (unit_mask == 0).sum()), # Rows after explode(): one per unit, or one if none
+        "office": count_table(df["Office Location"].value_counts(sort=False), "Office Location", LOCATION_LABELS),
+        "race_total": count_table(race_counts, "Race/Ethnicity", RACE_LABELS, total),
+        "race_total_n": int(race_counts.sum() + (race_bits == 0).sum()),
+        "race_unique": count_table(race_unique.value_counts(sort=False), "Race/Ethnicity", RACE_LABELS),
+        "gender": count_table(df["Sex"].value_counts(sort=False), "Gender", GENDER_LABELS),
+    }
+
+# Define dashboard_cube()
+def dashboard_cube(df: pd.DataFrame | None = None) -> dict:
+    """Aggregates of df, or of the shared "dashboard" projection (built once per snapshot version)"""
+    if df is not None:
+        return build_dashboard_cube(df)
+    view = get_projection_view("dashboard")
+    return derived(view, "dashboard_cube", lambda: build_dashboard_cube(view["frame"]))
 
 # Define summary_metrics(df):
-def summary_metrics(df: pd.DataFrame = staff_view):
+def summary_metrics(df: pd.DataFrame | None = None):
     """Display summary statistics of JCPAO staff"""
 
+    cube = dashboard_cube(df)
+
     cols = st.columns(5)
 
-    cols[0].metric("Total Staff", value=len(df), delta=None, delta_color="normal")
-    cols[1].metric("Executive Staff", value=len(df[df["Position"] == "Exec"]), delta=None, delta_color="normal")
-    cols[2].metric("Total Attorneys", value=len(df[df["Position"].isin(['CTA', 'TTL', 'APA'])]), delta=None, delta_color="normal")
-    cols[3].metric("Total Support Staff", value=len(df[df["Position"].isin(['I', 'LA', 'VA', 'SS'])]), delta=None, delta_color="normal")
-    cols[4].metric("Total Interns", value=len(df[df["Position"] == 'INTERN']), delta=None, delta_color="normal")
+    cols[0].metric("Total Staff", value=cube["total"], delta=None, delta_color="normal")
+    for col, (name, value) in zip(cols[1:], cube["summary"].items()):
+        col.metric(name, value=value, delta=None, delta_color="normal")
 
     style_metric_cards()
 
 
 # Define position_metrics(df)
-def position_metrics(df: pd.DataFrame = staff_view):
+def position_metrics(df: pd.DataFrame | None = None):
     """Display job position breakdown of JCPAO staff"""
 
-    st.subheader("💼 JCPAO Staff by Job Position")
+    cube = dashboard_cube(df)
 
-    positions_dict = {
-        'Exec': 'Executive Staff', 
-        'CTA': 'Chief Trial Attorneys', 
-        'TTL': 'Team Trial Leaders', 
-        'APA': 'Assistant Prosecuting Attorneys',
-        'I': 'Investigators',
-        'VA': 'Victim Advocates',
-        'LA': 'Legal Assistants',
-        'SS': 'Support Staff',
-        'INTERN': 'Interns'
-    }
+    st.subheader("💼 JCPAO Staff by Job Position")
 
     # ----- Count and Percentage -----
-    # df = df.dropna(subset=['Position'])
-    position_counts = df["Position"].value_counts().reset_index()
-    position_counts.columns = ["Position", "Count"]
-    position_counts["Position"] = position_counts["Position"].replace(positions_dict)
-    position_counts["Percent"] = (position_counts["Count"] / position_counts["Count"].sum() * 100).round(2)
+    position_counts = cube["position"]
 
     # ----- Plotly Bar Chart -----
     fig = px.bar(
@@ -91,7 +205,7 @@ def position_metrics(df: pd.DataFrame = staff_view):
         
         # ----- Display Chart -----
         st.plotly_chart(fig, width="stretch")
-        st.caption(f"Bar chart depicting job position breakdown of JCPAO staff (n={len(df)}).")
+        st.caption(f"Bar chart depicting job position breakdown of JCPAO staff (n={cube['total']}).")
 
     with position_display[1]:
 
@@ -110,34 +224,15 @@ def position_metrics(df: pd.DataFrame = staff_view):
         )
 
 # Define unit_metrics(df)
-def unit_metrics(df: pd.DataFrame = staff_view):
+def unit_metrics(df: pd.DataFrame | None = None):
     """Display assigned unit breakdown of JCPAO staff"""
 
-    st.subheader("🧑‍🧑‍🧒‍🧒 JCPAO Staff by Assigned Unit")
+    cube = dashboard_cube(df)
 
-    units_dict = {
-        'Exec': 'Executive Staff',
-        'GCU': 'General Crimes Unit (GCU)',
-        'SVU': 'Special Victims Unit (SVU)',
-        'VCU': 'Violent Crimes Unit (VCU)',
-        'CSU': 'Crime Strategies Unit (CSU)',
-        'COMBAT': 'COMBAT',
-        'Drug': 'Drug Court',
-        'FSD': 'Family Support Division',
-        'WARRANT': 'Warrant Desk'
-    }
+    st.subheader("🧑‍🧑‍🧒‍🧒 JCPAO Staff by Assigned Unit")
 
     # ----- Count and Percentage -----
-
-    # Get length of employee_info_view (active JCPAO employees)
-    total_rows = len(df)
-
-    # df = df.dropna(subset=['Assigned Unit'])
-    exploded = df.explode('Assigned Unit').reset_index(drop=True) # Flatten enum[]
-    unit_total_counts = exploded['Assigned Unit'].value_counts().reset_index()
-    unit_total_counts.columns = ['Assigned Unit', 'Count']
-    unit_total_counts['Assigned Unit'] = unit_total_counts['Assigned Unit'].replace(units_dict)
-    unit_total_counts['Percent'] = (unit_total_counts['Count'] / total_rows * 100).round(2)
+    unit_total_counts = cube["unit"] # Percent of all staff -- staff in several units count in each
 
     # ----- Plotly Bar Chart -----
     fig = px.bar(
@@ -174,7 +269,7 @@ def unit_metrics(df: pd.DataFrame = staff_view):
     with unit_display[0]:
         # ----- Display Chart -----
         st.plotly_chart(fig, width="stretch")
-        st.caption(f"Bar chart depicting breakdown of JCPAO staff by assigned unit(s). Staff who are assigned to more than one unit are counted in each unit (n={len(exploded)}).")
+        st.caption(f"Bar chart depicting breakdown of JCPAO staff by assigned unit(s). Staff who are assigned to more than one unit are counted in each unit (n={cube['unit_n']}).")
     
     with unit_display[1]:
         # st.dataframe 
@@ -192,26 +287,15 @@ def unit_metrics(df: pd.DataFrame = staff_view):
         )
 
 # Define office_metrics(df)
-def office_metrics(df: pd.DataFrame = staff_view):
+def office_metrics(df: pd.DataFrame | None = None):
     """Display office location breakdown of JCPAO staff"""
 
-    locations_dict = {
-        'Dt-11': 'Downtown (11th)',
-        'Dt-10': 'Downtown (10th)',
-        'Dt-9': 'Downtown (9th)',
-        'Dt-7M': 'Downtown (7M)',
-        'Indy': 'Independence',
-        'FSD': 'Family Support Division'
-    }
+    cube = dashboard_cube(df)
 
     st.subheader("🏢 JCPAO Staff by Office Location")
 
     # ----- Count and Percentage -----
-    # df = df.dropna(subset=['Office Location'])
-    office_counts = df["Office Location"].value_counts().reset_index()
-    office_counts.columns = ["Office Location", "Count"]
-    office_counts["Percent"] = (office_counts["Count"] / office_counts["Count"].sum() * 100).round(2)
-    office_counts["Office Location"] = office_counts["Office Location"].replace(locations_dict)
+    office_counts = cube["office"]
 
     # ----- Plotly Bar Chart -----
     fig = px.bar(
@@ -248,7 +332,7 @@ def office_metrics(df: pd.DataFrame = staff_view):
         
         # ----- Display Chart -----
         st.plotly_chart(fig, width="stretch")
-        st.caption(f"Bar chart depicting breakdown of JCPAO staff by office location (n={len(df)}).")
+        st.caption(f"Bar chart depicting breakdown of JCPAO staff by office location (n={cube['total']}).")
 
     with office_display[1]:
 
@@ -267,11 +351,13 @@ def office_metrics(df: pd.DataFrame = staff_view):
         )
 
 # Define service_years_metrics(df)
-def service_years_metrics(df: pd.DataFrame = staff_view): # user_email: str, 
+def service_years_metrics(df: pd.DataFrame | None = None): # user_email: str, 
     """Display service duration statistics of JCPAO staff"""
 
+    df = staff_df(df)
+
     # ----- Filter Data -----
-    df["Service (years)"] = (df["Service (days)"] / 365).round(2)  # Convert days to years
+    df = df.assign(**{"Service (years)": (df["Service (days)"] / 365).round(2)})  # Convert days to years
 
     min_years = int(df["Service (years)"].min())
     max_years = int(df["Service (years)"].max())
@@ -336,9 +422,11 @@ def service_years_metrics(df: pd.DataFrame = staff_view): # user_email: str,
 
 
 # Define service_days_metrics(df)
-def service_days_metrics(df: pd.DataFrame = staff_view): # user_email: str, 
+def service_days_metrics(df: pd.DataFrame | None = None): # user_email: str, 
     """Display service duration statistics of JCPAO staff"""
 
+    df = staff_df(df)
+
     # ----- Sidebar Filters -----
     min_days = int(df["Service (days)"].min())
     max_days = int(df["Service (days)"].max())
@@ -419,18 +507,10 @@ def service_days_metrics(df: pd.DataFrame = staff_view): # user_email: str,
 
 
 # Define race_total_metrics(df)
-def race_total_metrics(df: pd.DataFrame = staff_view):
+def race_total_metrics(df: pd.DataFrame | None = None):
     """Display racial/ethnic breakdown (how many identify with 'x' race) of JCPAO staff"""
 
-    race_dict = {
-        "W": "White",
-        "B": "Black / African American",
-        "A": "Asian",
-        "H": "Hispanic / Latino",
-        "AIAN": "American Indian / Alaska Native",
-        "NHPI": "Native Hawaiian / Pacific Islander",
-        "O": "Other"
-    }
+    cube = dashboard_cube(df)
 
     colors_dict = {
         "White": "#66c2a5",
@@ -443,16 +523,7 @@ def race_total_metrics(df: pd.DataFrame = staff_view):
     }
 
     # ----- Count and Percentage -----
-
-    # Get length of employee_info_view (active JCPAO employees)
-    total_rows = len(df)
-
-    # df = df.dropna(subset=['Race'])
-    exploded = df.explode('Race').reset_index(drop=True) # Flatten enum[]
-    race_total_counts = exploded['Race'].value_counts().reset_index()
-    race_total_counts.columns = ['Race/Ethnicity', 'Count']
-    race_total_counts['Race/Ethnicity'] = race_total_counts['Race/Ethnicity'].replace(race_dict)
-    race_total_counts['Percent'] = (race_total_counts['Count'] / total_rows * 100).round(2)
+    race_total_counts = cube["race_total"] # Percent of all staff -- staff of several races count in each
 
     # ----- Plotly Bar Chart -----
     fig = px.bar(
@@ -485,7 +556,7 @@ def race_total_metrics(df: pd.DataFrame = staff_view):
 
     # ----- Display Chart -----
     st.plotly_chart(fig, width="stretch")
-    st.caption(f"Bar chart depicting racial/ethnic breakdown of JCPAO staff. Staff who identify with more than one race/ethnicity are counted in each category they identify with (n={len(exploded)}).")
+    st.caption(f"Bar chart depicting racial/ethnic breakdown of JCPAO staff. Staff who identify with more than one race/ethnicity are counted in each category they identify with (n={cube['race_total_n']}).")
 
     # st.dataframe 
     st.write("**Table View**")
@@ -503,19 +574,10 @@ def race_total_metrics(df: pd.DataFrame = staff_view):
 
 
 # Define race_unique_metrics(df)
-def race_unique_metrics(df: pd.DataFrame = staff_view):
+def race_unique_metrics(df: pd.DataFrame | None = None):
     """Display racial/ethnic breakdown (incl. "Multiple" value) of JCPAO staff"""
 
-    race_dict = {
-        "W": "White",
-        "B": "Black / African American",
-        "A": "Asian",
-        "H": "Hispanic / Latino",
-        "AIAN": "American Indian / Alaska Native",
-        "NHPI": "Native Hawaiian / Pacific Islander",
-        "O": "Other",
-        "Multiple": "Multiple"
-    }
+    cube = dashboard_cube(df)
 
     colors_dict = {
         "White": "#66c2a5",
@@ -529,11 +591,7 @@ def race_unique_metrics(df: pd.DataFrame = staff_view):
     }
 
     # ----- Count and Percentage -----
-    df["race_unique"] = ["Unknown" if len(value) == 0 else "Multiple" if len(value) > 1 else value[0] for value in df["Race"]]
-    race_unique_counts = df["race_unique"].value_counts().reset_index()
-    race_unique_counts.columns = ["Race/Ethnicity", "Count"]
-    race_unique_counts["Race/Ethnicity"] = race_unique_counts["Race/Ethnicity"].replace(race_dict)
-    race_unique_counts["Percent"] = (race_unique_counts["Count"] / race_unique_counts["Count"].sum() * 100).round(2)
+    race_unique_counts = cube["race_unique"]
 
     # ----- Plotly Pie Chart -----
     fig = px.pie(
@@ -579,21 +637,16 @@ def race_unique_metrics(df: pd.DataFrame = staff_view):
 
 
 # Define gender_metrics(df)
-def gender_metrics(df: pd.DataFrame = staff_view):
+def gender_metrics(df: pd.DataFrame | None = None):
     """Display gender breakdown of JCPAO staff"""
 
+    cube = dashboard_cube(df)
+
     # ----- Title -----
     st.subheader("👥 JCPAO Staff by Gender")
 
     # ----- Count and Percentage -----
-    gender_counts = df["Sex"].value_counts().reset_index()
-    gender_counts.columns = ["Gender", "Count"]
-    gender_counts["Gender"] = gender_counts["Gender"].replace({
-        "M": "Male",
-        "F": "Female",
-        "O": "Other / Prefer not to say"
-    })
-    gender_counts["Percent"] = (gender_counts["Count"] / gender_counts["Count"].sum() * 100).round(2)
+    gender_counts = cube["gender"]
 
     # ----- Plotly Pie Chart -----
     fig = px.pie(
@@ -619,7 +672,7 @@ def gender_metrics(df: pd.DataFrame = staff_view):
         
         # ----- Display Chart -----
         st.plotly_chart(fig, width="stretch")
-        st.caption(f"Pie chart depicting gender breakdown of JCPAO staff (n={len(df)}).")
+        st.caption(f"Pie chart depicting gender breakdown of JCPAO staff (n={cube['total']}).")
 
     with gender_display[1]:
 
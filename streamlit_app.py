@@ -1,12 +1,12 @@
 import streamlit as st
-from pathlib import Path
 import time
 
-from connect_data import log_user
+from connect_data import log_user, get_db_connection
+from asset_registry import page_logo
 
 # --- Configure Streamlit page settings --- 
 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
+jcpao_logo = page_logo() # Loaded once per process
 
 st.set_page_config(
     page_title="JCPAO Directory", # court-view only
@@ -132,6 +132,7 @@ def display_portal():
 # --- RUN STREAMLIT APP --- 
 
 if not st.session_state["verified"]:
+    get_db_connection() # Warm up the connection pool (in the background) while the user fills in the portal
     display_portal() # Display verification portal
 
 else: # st.session_state["verified"] == TRUE
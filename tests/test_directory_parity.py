@@ -0,0 +1,208 @@
+"""
+File: tests/test_directory_parity.py
+Function: The search / facet / dashboard engines give the same rows and counts as the original pandas filters
+"""
+
+import itertools
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from connect_data import type_snapshot, filter_conditions, COURT_COLUMNS, UNIT_CODES, RACE_CODES
+from directory_facets import FacetIndex
+import directory_search
+from directory_search import NameIndex, SEARCH_COLUMNS
+from staff_dashboard_metrics import build_dashboard_cube, POSITION_LABELS, UNIT_LABELS, LOCATION_LABELS, RACE_LABELS, GENDER_LABELS
+
+
+# --- Synthetic directory ---
+
+POSITIONS = ['Exec', 'CTA', 'TTL', 'APA', 'I', 'VA', 'LA', 'SS', 'INTERN', 'PET']
+LOCATIONS = ['Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD']
+FIRST_NAMES = ["John", "Jon", "Maria", "Mariah", "Stephen", "Steven", "Kathryn", "Sean", "Aisha", "Jose", "Ann"]
+LAST_NAMES = ["Smith", "Smyth", "Johnson", "Garcia", "O'Neil", "Peters", "Petersen", "Stone", "Lee", "Miller"]
+
+@pytest.fixture(scope="module")
+def directory() -> pd.DataFrame:
+    """500 typed directory rows (some without units, race, month or middle name)"""
+    rng = random.Random(0)
+    rows = []
+    for _ in range(500):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append({
+            "Full Name": f"{first} {last}",
+            "First Name": first,
+            "Middle Name": rng.choice([None, "Lee", "Marie"]),
+            "Last Name": last,
+            "Suffix": rng.choice([None, None, "Jr."]),
+            "Preferred Name": rng.choice([None, None, first[:3]]),
+            "Position": rng.choice(POSITIONS),
+            "Assigned Unit": rng.sample(UNIT_CODES, rng.choice([0, 1, 1, 2])),
+            "Office Location": rng.choice(LOCATIONS),
+            "DOB Month": rng.choice([None] + list(range(1, 13))),
+            "Race": rng.sample(RACE_CODES, rng.choice([0, 1, 1, 1, 2])),
+            "Sex": rng.choice(["M", "F", "O"]),
+        })
+    return type_snapshot(pd.DataFrame(rows))
+
+
+# --- Facets ---
+
+# 4 x 4 x 3 x 9 = 432 filter combinations, including options no row has
+FACET_OPTIONS = {
+    "position": ["All", "APA", "PET", "SS"],
+    "unit": ["All", "GCU", "Drug", "WARRANT"],
+    "location": ["All", "Dt-11", "Indy"],
+    "month": ["All", "1", "2", "3", "5", "8", "11", "12", "13"],
+}
+
+# Define pandas_filter()
+def pandas_filter(df: pd.DataFrame, filters: dict) -> np.ndarray:
+    """Row positions picked by the original page-level pandas filters"""
+    mask = pd.Series(True, index=df.index)
+    if filters["position"] != "All":
+        mask &= df["Position"] == filters["position"]
+    if filters["unit"] != "All":
+        mask &= df["Assigned Unit"].apply(lambda units: filters["unit"] in units)
+    if filters["location"] != "All":
+        mask &= df["Office Location"] == filters["location"]
+    if filters["month"] != "All":
+        mask &= (df["DOB Month"] == int(filters["month"])).fillna(False)
+    return np.flatnonzero(mask.to_numpy(dtype=bool))
+
+def test_facet_positions_match_pandas_filters(directory):
+    index = FacetIndex(directory)
+    for combination in itertools.product(*FACET_OPTIONS.values()):
+        filters = dict(zip(FACET_OPTIONS, combination))
+        np.testing.assert_array_equal(index.positions(filters), pandas_filter(directory, filters), err_msg=str(filters))
+
+def test_facet_counts_match_pandas_filters(directory):
+    index = FacetIndex(directory)
+    filters = {"position": "APA", "unit": "All", "location": "Dt-11", "month": "All"}
+    counts = index.counts(filters, "unit")
+    assert counts["All"] == len(pandas_filter(directory, filters))
+    for unit in UNIT_CODES:
+        assert counts.get(unit, 0) == len(pandas_filter(directory, {**filters, "unit": unit}))
+
+
+# --- Name search ---
+
+QUERIES = ["j", "jo", "son", "smi", "mar", "ith", "o'n", "ann", "jr.", "stev", "petersen", "sean stone", "zz"]
+
+# Define pandas_search()
+def pandas_search(df: pd.DataFrame, query: str) -> np.ndarray:
+    """Row positions with the query in any name column (the original search, skipping missing values)"""
+    mask = df[SEARCH_COLUMNS].apply(lambda row: any(isinstance(value, str) and query in value.lower() for value in row), axis=1)
+    return np.flatnonzero(mask.to_numpy(dtype=bool))
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_pandas(directory, query):
+    index = NameIndex(directory)
+    np.testing.assert_array_equal(index.search(query), pandas_search(directory, query))
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_refine_matches_search(directory, query):
+    index = NameIndex(directory)
+    np.testing.assert_array_equal(index.refine(index.search(query[:1]), query), index.search(query))
+
+def test_search_ignores_case_and_accents():
+    index = NameIndex(pd.DataFrame({"Full Name": ["José Núñez", "Jose Nunez", "Zoë Lee"]}))
+    np.testing.assert_array_equal(index.search("JOSE NUNEZ"), [0, 1])
+    np.testing.assert_array_equal(index.search("zoe"), [2])
+
+@pytest.mark.parametrize("query", ["jo", "pet", "o", "lee"])
+def test_prefix_matches_pandas(directory, query):
+    index = NameIndex(directory)
+    expected = directory[SEARCH_COLUMNS].apply(
+        lambda row: any(
+            isinstance(value, str) and any(word.startswith(query) for word in "".join(ch if ch.isalnum() else " " for ch in value.lower()).split())
+            for value in row
+        ),
+        axis=1,
+    )
+    np.testing.assert_array_equal(index.prefix(query), np.flatnonzero(expected.to_numpy(dtype=bool)))
+
+def test_fuzzy_finds_typos(directory):
+    index = NameIndex(directory)
+    smiths = set(np.flatnonzero((directory["Last Name"] == "Smith").to_numpy()))
+    assert smiths <= set(index.fuzzy("smtih"))
+
+def test_fuzzy_budget_stops_edit_distance_scans(directory, monkeypatch):
+    index = NameIndex(directory)
+    calls = []
+    monkeypatch.setattr(directory_search, "edit_distance", lambda *args: calls.append(args) or 0)
+    positions = index.fuzzy("jon", budget=0)
+    assert calls == []
+    assert set(index.prefix("jon")) <= set(positions) # Prefix matches are found before any scan
+
+
+# --- Dashboard cube ---
+
+# Define sorted_table()
+def sorted_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Count table in label order (ties may come out in either order)"""
+    return table.sort_values(table.columns[0], ignore_index=True)
+
+# Define pandas_table()
+def pandas_table(values: pd.Series, column: str, labels: dict, total: int | None = None) -> pd.DataFrame:
+    """The original value_counts() table of a dashboard chart"""
+    table = values.value_counts().reset_index()
+    table.columns = [column, "Count"]
+    table[column] = table[column].astype(str).replace(labels)
+    table["Percent"] = (table["Count"] / (table["Count"].sum() if total is None else total) * 100).round(2)
+    return table
+
+# Staff with enum values UNIT_CODES / RACE_CODES don't list yet (e.g. added to unit_enum / race_enum in Postgres)
+UNKNOWN_CODES = [
+    {"Assigned Unit": ["TRIAL"], "Race": ["MENA"]},
+    {"Assigned Unit": ["GCU", "TRIAL"], "Race": ["W", "MENA"]},
+    {"Assigned Unit": [], "Race": ["MENA"]},
+]
+
+@pytest.mark.parametrize("unknown_codes", [False, True])
+def test_dashboard_cube_matches_pandas(directory, unknown_codes):
+    staff = directory[directory["Position"] != "PET"].reset_index(drop=True)
+    if unknown_codes:
+        extra = staff.head(len(UNKNOWN_CODES)).drop(columns=["Unit Mask", "Race Mask"]).assign(
+            **{column: [row[column] for row in UNKNOWN_CODES] for column in ["Assigned Unit", "Race"]})
+        staff = pd.concat([staff, type_snapshot(extra)], ignore_index=True)
+        staff["Position"] = staff["Position"].astype("category")
+    staff["Position"] = staff["Position"].cat.remove_unused_categories()
+    cube = build_dashboard_cube(staff)
+    total = len(staff)
+
+    units = staff.explode("Assigned Unit")
+    races = staff.explode("Race")
+    race_unique = pd.Series(["Unknown" if len(race) == 0 else "Multiple" if len(race) > 1 else race[0] for race in staff["Race"]])
+    expected = {
+        "position": pandas_table(staff["Position"], "Position", POSITION_LABELS),
+        "unit": pandas_table(units["Assigned Unit"], "Assigned Unit", UNIT_LABELS, total),
+        "office": pandas_table(staff["Office Location"], "Office Location", LOCATION_LABELS),
+        "race_total": pandas_table(races["Race"], "Race/Ethnicity", RACE_LABELS, total),
+        "race_unique": pandas_table(race_unique, "Race/Ethnicity", RACE_LABELS),
+        "gender": pandas_table(staff["Sex"], "Gender", GENDER_LABELS),
+    }
+
+    assert cube["total"] == total
+    assert cube["unit_n"] == len(units)
+    assert cube["race_total_n"] == len(races)
+    assert cube["summary"]["Total Attorneys"] == staff["Position"].isin(['CTA', 'TTL', 'APA']).sum()
+    for name, table in expected.items():
+        assert cube[name]["Count"].is_monotonic_decreasing, name
+        pd.testing.assert_frame_equal(sorted_table(cube[name]), sorted_table(table), check_dtype=False, obj=name)
+    if unknown_codes:
+        assert cube["unit"].set_index("Assigned Unit").loc["TRIAL", "Count"] == 2
+        assert cube["race_unique"].set_index("Race/Ethnicity").loc["MENA", "Count"] == 2
+
+
+# --- Query pushdown ---
+
+def test_court_pushdown_uses_court_columns():
+    for month, text in itertools.product(["All", "3"], ["", "smith"]):
+        where, params = filter_conditions("court", ("APA", "GCU", "Dt-11", month, text))
+        referenced = set(re.findall(r'"([^"]+)"', where.as_string(None)))
+        assert referenced <= set(COURT_COLUMNS)
+        assert "month" not in params
@@ -0,0 +1,118 @@
+"""
+File: tests/test_headshot_store.py
+Function: HeadshotStore thumbnails, cache and content hashes against a LocalHeadshotBackend folder
+"""
+
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from headshot_store import HeadshotStore, LocalHeadshotBackend, resize_image, scan_headshots, THUMBNAIL_CACHE_LOW_WATER
+
+PREFIX = "JCPAO_headshots/"
+
+# Define write_image()
+def write_image(path, size=(600, 800), color="red"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+
+
+class CountingBackend(LocalHeadshotBackend):
+    """LocalHeadshotBackend that counts fetches / listings and checks listings run without the store lock"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.fetches = 0
+        self.listings = 0
+        self.store = None
+
+    def fetch(self, public_id):
+        self.fetches += 1
+        return super().fetch(public_id)
+
+    def assets(self, prefix=""):
+        self.listings += 1
+        assert self.store is None or not self.store.lock.locked()
+        return super().assets(prefix)
+
+@pytest.fixture
+def store(tmp_path):
+    write_image(tmp_path / "images" / PREFIX / "jsmith.jpg")
+    backend = CountingBackend(tmp_path / "images")
+    store = HeadshotStore(backend, tmp_path / "cache", prefix=PREFIX)
+    backend.store = store
+    return store
+
+def test_resize_image_sizes():
+    original = io.BytesIO()
+    Image.new("RGB", (600, 800)).save(original, "PNG")
+    with Image.open(io.BytesIO(resize_image(original.getvalue(), 120, 120))) as image:
+        assert (image.format, image.size) == ("WEBP", (120, 120))
+    with Image.open(io.BytesIO(resize_image(original.getvalue(), 300))) as image:
+        assert image.size == (300, 400)
+    with Image.open(io.BytesIO(resize_image(original.getvalue(), 1000))) as image:
+        assert image.size == (600, 800) # Never upscaled
+
+def test_thumbnail_is_cached(store):
+    first = store.thumbnail(PREFIX + "jsmith", 120, 120)
+    assert first is not None
+    assert store.thumbnail(PREFIX + "jsmith", 120, 120) == first
+    assert store.backend.fetches == 1
+    assert store.backend.listings == 1
+
+def test_missing_headshot(store):
+    assert store.thumbnail(PREFIX + "nobody", 120, 120) is None
+    assert store.backend.fetches == 0
+
+def test_reupload_gets_a_new_thumbnail(store, tmp_path):
+    first = store.thumbnail(PREFIX + "jsmith", 120, 120)
+    write_image(tmp_path / "upload.png", color="blue")
+    store.backend.upload(tmp_path / "upload.png", PREFIX + "jsmith")
+    store.forget()
+    assert store.thumbnail(PREFIX + "jsmith", 120, 120) != first
+
+def test_stale_listing_refreshes_in_background(store, tmp_path):
+    store.etag_ttl = 0
+    assert store.etag(PREFIX + "jsmith") is not None
+    write_image(tmp_path / "images" / PREFIX / "adoe.jpg")
+    store.etag(PREFIX + "adoe") # Stale: served from the previous listing while it re-lists
+    for _ in range(100):
+        if store.backend.listings >= 2 and not store.refreshing:
+            break
+        time.sleep(0.01)
+    assert store.etags.get(PREFIX + "adoe") is not None
+
+def test_set_etags_skips_listing(store):
+    store.set_etags(store.backend.assets(PREFIX))
+    listings = store.backend.listings
+    assert store.etag(PREFIX + "jsmith") is not None
+    assert store.backend.listings == listings
+
+def test_eviction_drops_least_recently_used(store, tmp_path):
+    names = ["a", "b", "c", "d"]
+    for name in names:
+        write_image(tmp_path / "images" / PREFIX / f"{name}.jpg")
+    store.forget()
+    for age, name in zip([40, 30, 20, 10], names): # "a" used longest ago
+        store.thumbnail(PREFIX + name, 400)
+        path = store.cache_path(PREFIX + name, store.etag(PREFIX + name), 400, None)
+        os.utime(path, (time.time() - age, time.time() - age))
+
+    store.max_bytes = store.used - 1
+    store.evict()
+    assert store.used <= store.max_bytes * THUMBNAIL_CACHE_LOW_WATER
+    assert store.used == sum(path.stat().st_size for path in store.cache_dir.glob("*.webp"))
+    cached = {path.name.split("-")[0] for path in store.cache_dir.glob("*.webp")}
+    assert PREFIX.replace("/", "__") + "a" not in cached
+    assert PREFIX.replace("/", "__") + "d" in cached
+
+def test_scan_reports_missing_and_orphaned(store, tmp_path):
+    write_image(tmp_path / "images" / PREFIX / "~unusual.jpg") # Any first character is listed
+    write_image(tmp_path / "images" / PREFIX / "orphan.jpg", size=(3000, 100))
+    report = scan_headshots(store.backend.assets(PREFIX), ["jsmith", "~unusual", "nobody", None], PREFIX)
+    assert report["missing"] == ["nobody"]
+    assert report["orphaned"] == [PREFIX + "orphan"]
+    assert list(report["oversized"]) == [PREFIX + "orphan"]
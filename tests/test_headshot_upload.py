@@ -0,0 +1,136 @@
+"""
+File: tests/test_headshot_upload.py
+Function: Bulk uploads -- skipping, resuming and which PhotoIDs get saved -- against a LocalHeadshotBackend folder
+"""
+
+import pytest
+from PIL import Image
+
+from headshot_store import LocalHeadshotBackend
+from headshot_upload import upload_headshots, read_mapping
+
+PREFIX = "JCPAO_headshots/"
+
+
+class FlakyBackend(LocalHeadshotBackend):
+    """LocalHeadshotBackend whose uploads (invalidations) of the public IDs in self.failing (self.stuck) raise"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.failing = set()
+        self.stuck = set()
+        self.uploads = []
+        self.invalidated = []
+
+    def invalidate(self, public_id):
+        if public_id in self.stuck:
+            raise OSError("invalidation failed")
+        self.invalidated.append(public_id)
+
+    def upload(self, path, public_id):
+        if public_id in self.failing:
+            raise OSError("upload failed")
+        self.uploads.append(public_id)
+        super().upload(path, public_id)
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "photos"
+    folder.mkdir()
+    for name, color in [("smith.jpg", "red"), ("doe.jpg", "blue"), ("rex.jpg", "green")]:
+        Image.new("RGB", (60, 80), color).save(folder / name)
+    (folder / "mapping.csv").write_text(
+        "File,PhotoID,Work Email Address,Pet Name\n"
+        "smith.jpg,jsmith,js@jacksongov.org,\n"
+        "doe.jpg,adoe,ad@jacksongov.org,\n"
+        "rex.jpg,rex,js@jacksongov.org,Rex\n",
+        encoding="utf-8",
+    )
+    return folder
+
+@pytest.fixture
+def saved():
+    return []
+
+@pytest.fixture
+def run(folder, tmp_path, saved):
+    backend = FlakyBackend(tmp_path / "store")
+
+    def run(mapping=None):
+        def update_photo_ids(rows):
+            saved.extend(rows)
+            return len(rows)
+        return upload_headshots(folder, mapping or read_mapping(folder / "mapping.csv"), backend, update_photo_ids, PREFIX, workers=2)
+
+    run.backend = backend
+    return run
+
+def test_uploads_all_and_saves_employee_rows_only(run, saved):
+    report = run()
+    assert sorted(report["uploaded"]) == ["doe.jpg", "rex.jpg", "smith.jpg"]
+    assert sorted(saved) == [("adoe", "ad@jacksongov.org"), ("jsmith", "js@jacksongov.org")] # Not the pet
+    assert run.backend.path(PREFIX + "rex") is not None
+
+def test_rerun_skips_unchanged_files(run, saved):
+    run()
+    saved.clear()
+    report = run()
+    assert sorted(report["skipped"]) == ["doe.jpg", "rex.jpg", "smith.jpg"]
+    assert report["uploaded"] == [] and saved == []
+
+def test_failed_upload_is_not_saved_then_resumes(run, saved):
+    run.backend.failing = {PREFIX + "adoe"}
+    report = run()
+    assert list(report["failed"]) == ["doe.jpg"]
+    assert saved == [("jsmith", "js@jacksongov.org")]
+
+    run.backend.failing = set()
+    saved.clear()
+    report = run()
+    assert report["uploaded"] == ["doe.jpg"]
+    assert saved == [("adoe", "ad@jacksongov.org")]
+
+def test_failed_reupload_under_a_new_photo_id_is_not_saved(folder, tmp_path):
+    mapping = read_mapping(folder / "mapping.csv")
+    backend = FlakyBackend(tmp_path / "store")
+
+    def failing_update(rows):
+        raise ValueError("database down")
+    upload_headshots(folder, mapping, backend, failing_update, PREFIX) # Uploaded as jsmith, not saved
+
+    # smith.jpg now maps to a new PhotoID whose upload fails: the manifest still records the old target
+    mapping[0]["PhotoID"] = "jsmith2"
+    backend.failing = {PREFIX + "jsmith2"}
+    saved = []
+    report = upload_headshots(folder, mapping, backend, lambda rows: saved.extend(rows) or len(rows), PREFIX)
+    assert "smith.jpg" in report["failed"]
+    assert saved == [("adoe", "ad@jacksongov.org")]
+
+def test_database_error_keeps_rows_unsaved(folder, tmp_path):
+    def failing_update(rows):
+        raise ValueError("Pet PhotoIDs can't be saved")
+    mapping = read_mapping(folder / "mapping.csv")
+    backend = FlakyBackend(tmp_path / "store")
+    report = upload_headshots(folder, mapping, backend, failing_update, PREFIX)
+    assert report["failed"] == {"database update": "Pet PhotoIDs can't be saved"}
+
+    saved = []
+    report = upload_headshots(folder, mapping, backend, lambda rows: saved.extend(rows) or len(rows), PREFIX)
+    assert report["saved"] == 2 and len(saved) == 2 # Retried on the next run
+
+def test_failed_invalidation_is_retried_on_rerun(run, saved):
+    run.backend.stuck = {PREFIX + "adoe"}
+    report = run()
+    assert report["failed"] == {"doe.jpg (CDN invalidation)": "invalidation failed"}
+    assert sorted(run.backend.invalidated) == [PREFIX + "jsmith", PREFIX + "rex"]
+    assert len(saved) == 2 # Doesn't hold up the database update
+
+    run.backend.stuck = set()
+    run.backend.invalidated.clear()
+    report = run()
+    assert report["uploaded"] == [] and report["failed"] == {}
+    assert run.backend.invalidated == [PREFIX + "adoe"] # Only the pending one
+
+    run.backend.invalidated.clear()
+    run()
+    assert run.backend.invalidated == []
@@ -0,0 +1,156 @@
+"""
+File: tests/test_snapshot_sync.py
+Function: Delta sync leaves the snapshot exactly as a full reload would, against an in-memory stand-in for Postgres
+"""
+
+import hashlib
+import re
+import threading
+
+import pandas as pd
+import pytest
+
+import connect_data
+from connect_data import new_snapshot, sync_snapshot, full_sync
+
+
+# --- Fake database ---
+
+STAFF_COLUMNS = [
+    "Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name", "Karpel ID",
+    "Work Phone #", "Personal Phone #", "Work Email Address", "Personal Email Address", "Job Title",
+    "Position", "Assigned Unit", "Office Location", "Hire Start Date", "Service (days)", "Service (percentile)",
+    "DOB", "DOB Month", "DOB Day", "Race", "Sex", "PhotoID",
+]
+PET_COLUMNS = [
+    "Pet Full Name", "Pet Last Name", "Pet Pref Name", "Work Email Address", "Pet Job Title", "Assigned Unit",
+    "Office Location", "Pet DOB", "Pet DOB Month", "Pet DOB Day", "Pet PhotoID",
+]
+
+QUERY = re.compile(r'SELECT (?P<columns>.+), md5\(src::text\) AS "Row Hash" FROM (?P<table>\w+) AS src WHERE (?P<where>.+)')
+
+# Define staff_row()
+def staff_row(first: str, last: str, email: str | None, **values) -> dict:
+    row = dict.fromkeys(STAFF_COLUMNS)
+    row.update({
+        "Full Name": f"{first} {last}", "First Name": first, "Last Name": last, "Work Email Address": email,
+        "Job Title": "APA", "Position": "APA", "Assigned Unit": ["GCU"], "Office Location": "Dt-11",
+        "DOB Month": 3, "DOB Day": 4, "Race": ["W"], "Sex": "F",
+    })
+    row.update(values)
+    return row
+
+# Define pet_row()
+def pet_row(name: str, owner: str, **values) -> dict:
+    row = dict.fromkeys(PET_COLUMNS)
+    row.update({
+        "Pet Full Name": name, "Pet Last Name": "Dog", "Pet Pref Name": name, "Work Email Address": owner,
+        "Pet Job Title": "Good dog", "Assigned Unit": ["GCU"], "Office Location": "Dt-11", "Pet DOB Month": 5,
+    })
+    row.update(values)
+    return row
+
+
+class FakeDatabase:
+    """employee_info_view / active_pets as lists of dicts, answering the snapshot sync queries"""
+
+    def __init__(self):
+        self.tables = {"employee_info_view": [], "active_pets": []}
+
+    # Define fetch_frame()
+    def fetch_frame(self, sql_query, params=None, prepare=False, _connection=None) -> pd.DataFrame:
+        query = QUERY.fullmatch(str(sql_query))
+        columns = STAFF_COLUMNS if query["table"] == "employee_info_view" else PET_COLUMNS
+        rows = [{**row, "Row Hash": hashlib.md5(repr(list(row.values())).encode()).hexdigest()} for row in self.tables[query["table"]]]
+        if query["where"] != "TRUE":
+            rows = [row for row in rows if row["Row Hash"] in params[0]]
+        if query["columns"] != "src.*":
+            columns = re.findall(r'"([^"]+)"', query["columns"])
+        return pd.DataFrame(rows, columns=columns + ["Row Hash"])
+
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    database = FakeDatabase()
+    monkeypatch.setattr(connect_data, "fetch_frame", database.fetch_frame)
+    monkeypatch.setattr(connect_data, "SNAPSHOT_DIR", tmp_path / "snapshot")
+    database.tables["employee_info_view"] = [
+        staff_row("Ann", "Lee", "al@jacksongov.org"),
+        staff_row("Bo", "Stone", "bs@jacksongov.org"),
+        staff_row("Cy", "Peters", "cp@jacksongov.org"),
+    ]
+    database.tables["active_pets"] = [pet_row("Rex", "al@jacksongov.org")]
+    return database
+
+@pytest.fixture
+def store(database):
+    store = {
+        "lock": threading.Lock(),
+        "token": None,
+        "current": new_snapshot(0, pd.DataFrame(), pd.DataFrame(), pd.DataFrame()),
+        "hashes": {"staff": None, "pets": None},
+        "error": None,
+        "warming": False,
+    }
+    sync_snapshot(store, (0,), mode="delta") # Version 0: always a full load
+    return store
+
+# Define normalized()
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame as strings in a canonical row order, for comparing snapshots"""
+    df = df.astype(str)
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+# Define assert_matches_full_sync()
+def assert_matches_full_sync(store: dict):
+    frames, _ = full_sync(store)
+    for name in ["staff", "pets", "directory"]:
+        pd.testing.assert_frame_equal(normalized(store["current"][name]), normalized(frames[name]), obj=name)
+
+# Define sync()
+def sync(store: dict, token: int):
+    sync_snapshot(store, (token,), mode="delta")
+    assert store["error"] is None
+
+
+# --- Delta vs. full ---
+
+def test_edit_add_and_remove_rows(store, database):
+    staff = database.tables["employee_info_view"]
+    staff[0]["Job Title"] = "CTA"
+    staff.append(staff_row("Di", "Nunez", "dn@jacksongov.org"))
+    del staff[1]
+    database.tables["active_pets"][0]["Pet Job Title"] = "Very good dog"
+    sync(store, 1)
+    assert_matches_full_sync(store)
+    assert len(store["current"]["directory"]) == 4
+
+def test_unchanged_data_keeps_the_snapshot(store):
+    version = store["current"]["version"]
+    sync(store, 1)
+    assert store["current"]["version"] == version
+
+def test_null_keys_fall_back_to_full_sync(store, database):
+    staff = database.tables["employee_info_view"]
+    staff.append(staff_row("Ivy", "Tern", None, Position="INTERN"))
+    staff.append(staff_row("Max", "Tern", None, Position="INTERN"))
+    sync(store, 1)
+    assert_matches_full_sync(store)
+
+    staff[-1]["Job Title"] = "Law clerk" # Edit one of the two null-email rows
+    sync(store, 2)
+    assert_matches_full_sync(store)
+    assert {"Ivy Tern", "Max Tern"} <= set(store["current"]["staff"]["Full Name"])
+
+    sync(store, 3) # And the next sync doesn't lose either
+    assert_matches_full_sync(store)
+
+def test_pets_with_the_same_name_fall_back_to_full_sync(store, database):
+    pets = database.tables["active_pets"]
+    pets.append(pet_row("Rex", "al@jacksongov.org", **{"Pet DOB Month": 9}))
+    sync(store, 1)
+    assert_matches_full_sync(store)
+
+    pets[0]["Pet Job Title"] = "Retired"
+    sync(store, 2)
+    assert_matches_full_sync(store)
+    assert len(store["current"]["pets"]) == 2